@@ -1,9 +1,39 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from db.repository import catalog, idempotency_purger
+from auth.password_hasher import password_hasher
 from routers.product_router import product_router
 from auth.auth_router import auth_router
 from routers.transations_router import transaction_router
+from routers.reports_router import reports_router
+from routers.internal_router import internal_router
+from routers.metrics_router import metrics_router
+from api.metrics import MetricsMiddleware, QueryLogMiddleware, route_metrics
+from config import METRICS_ENABLED, QUERY_LOG_ENABLED, REQUEST_MAX_QUERIES, REQUEST_MAX_CONNECTIONS
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if catalog is not None:
+        await catalog.start()
+    await idempotency_purger.start()
+    yield
+    await idempotency_purger.stop()
+    if catalog is not None:
+        await catalog.stop()
+    password_hasher.shutdown()
+
+app = FastAPI(lifespan=lifespan)
+
+if QUERY_LOG_ENABLED:
+    app.add_middleware(
+        QueryLogMiddleware,
+        metrics=route_metrics,
+        max_queries=REQUEST_MAX_QUERIES,
+        max_connections=REQUEST_MAX_CONNECTIONS
+    )
+
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, metrics=route_metrics)
 
 app.include_router(
     auth_router,
@@ -20,3 +50,17 @@ app.include_router(
     tags=['Transactions endpoints']
 )
 
+app.include_router(
+    reports_router,
+    tags=['Reports endpoints']
+)
+
+app.include_router(
+    internal_router,
+    tags=['Internal endpoints']
+)
+
+app.include_router(
+    metrics_router,
+    tags=['Internal endpoints']
+)
@@ -0,0 +1,191 @@
+from bisect import bisect_left
+from typing import Any, Dict, List, Tuple
+from db.query_log import track_queries, query_totals
+import logging
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _route_label(scope) -> str:
+    route = scope.get('route')
+    return getattr(route, 'path', UNMATCHED_ROUTE) if route is not None else UNMATCHED_ROUTE
+
+
+class RouteMetrics:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.in_flight = 0
+        self.started_at = time.time()
+        # (method, route) -> [bucket counts..., +Inf count], sum
+        self._histograms: Dict[Tuple[str, str], List[int]] = {}
+        self._sums: Dict[Tuple[str, str], float] = {}
+        self._statuses: Dict[Tuple[str, str, int], int] = {}
+        # (method, route) -> [queries, seconds]
+        self._queries: Dict[Tuple[str, str], List[float]] = {}
+
+    def observe(self, method: str, route: str, status_code: int, duration: float) -> None:
+        key = (method, route)
+        counts = self._histograms.get(key)
+        if counts is None:
+            counts = self._histograms[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect_left(self.buckets, duration)] += 1
+        self._sums[key] += duration
+        status_key = (method, route, status_code)
+        self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+
+    def observe_queries(self, method: str, route: str, queries: int, duration: float) -> None:
+        totals = self._queries.get((method, route))
+        if totals is None:
+            totals = self._queries[(method, route)] = [0, 0.0]
+        totals[0] += queries
+        totals[1] += duration
+
+    def render(self) -> str:
+        lines = [
+            '# HELP http_requests_in_flight Requests currently being handled by this worker.',
+            '# TYPE http_requests_in_flight gauge',
+            f'http_requests_in_flight {self.in_flight}',
+            '# HELP http_requests_total Completed requests by route and status code.',
+            '# TYPE http_requests_total counter',
+        ]
+        for (method, route, status_code), count in sorted(self._statuses.items()):
+            lines.append(
+                f'http_requests_total{{method="{method}",route="{_escape(route)}",'
+                f'status="{status_code}"}} {count}'
+            )
+
+        lines.append('# HELP http_request_duration_seconds Request latency by route.')
+        lines.append('# TYPE http_request_duration_seconds histogram')
+        for (method, route), counts in sorted(self._histograms.items()):
+            labels = f'method="{method}",route="{_escape(route)}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {self._sums[(method, route)]:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {cumulative}')
+
+        if self._queries:
+            lines.append('# HELP http_request_db_queries_total SQL statements issued while handling requests, by route.')
+            lines.append('# TYPE http_request_db_queries_total counter')
+            for (method, route), (queries, _) in sorted(self._queries.items()):
+                lines.append(f'http_request_db_queries_total{{method="{method}",route="{_escape(route)}"}} {queries}')
+            lines.append('# HELP http_request_db_seconds_total Time spent in SQL statements while handling requests, by route.')
+            lines.append('# TYPE http_request_db_seconds_total counter')
+            for (method, route), (_, duration) in sorted(self._queries.items()):
+                lines.append(
+                    f'http_request_db_seconds_total{{method="{method}",route="{_escape(route)}"}} {duration:.6f}'
+                )
+
+        totals = query_totals()
+        lines.append('# HELP db_queries_total SQL statements issued by this worker.')
+        lines.append('# TYPE db_queries_total counter')
+        lines.append(f'db_queries_total {totals["queries"]}')
+        lines.append('# HELP db_slow_queries_total SQL statements slower than SLOW_QUERY_MS.')
+        lines.append('# TYPE db_slow_queries_total counter')
+        lines.append(f'db_slow_queries_total {totals["slow_queries"]}')
+
+        lines.append('# HELP process_start_time_seconds Start time of this worker since the epoch.')
+        lines.append('# TYPE process_start_time_seconds gauge')
+        lines.append(f'process_start_time_seconds {self.started_at:.3f}')
+        return '\n'.join(lines) + '\n'
+
+
+def render_password_hasher(stats: Dict[str, Any]) -> str:
+    """Prometheus lines for PasswordHasher.stats()."""
+    gauges = (
+        ('password_hash_queue_depth', 'Password hash/verify calls waiting for a slot.', 'waiting'),
+        ('password_hash_in_flight', 'Password hash/verify calls running in the executor.', 'in_flight'),
+    )
+    counters = (
+        ('password_hash_completed_total', 'Password hash/verify calls finished.', 'completed'),
+        ('password_hash_timeouts_total', 'Password hash/verify calls that timed out waiting or running.', 'timeouts'),
+    )
+    lines = []
+    for name, help_text, key in gauges:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {stats[key]}']
+    for name, help_text, key in counters:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter', f'{name} {stats[key]}']
+    lines += [
+        '# HELP password_hash_avg_wait_seconds Mean time a call waited for a slot.',
+        '# TYPE password_hash_avg_wait_seconds gauge',
+        f'password_hash_avg_wait_seconds {stats["avg_wait_time"]:.6f}',
+        '# HELP password_hash_avg_run_seconds Mean time a call ran in the executor.',
+        '# TYPE password_hash_avg_run_seconds gauge',
+        f'password_hash_avg_run_seconds {stats["avg_run_time"]:.6f}',
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streaming responses are not buffered.
+
+    Requests are labelled with the matched route template rather than the raw
+    path, which keeps the label set bounded.
+    """
+
+    def __init__(self, app, metrics: RouteMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        metrics.in_flight += 1
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            metrics.observe(scope['method'], _route_label(scope), status_code, time.perf_counter() - started_at)
+
+
+class QueryLogMiddleware:
+    """Counts the SQL statements and connections each request uses.
+
+    Requests above max_queries statements or max_connections connections are
+    logged with the repository methods that issued the statements.
+    """
+
+    def __init__(self, app, metrics: RouteMetrics, max_queries: int, max_connections: int):
+        self.app = app
+        self.metrics = metrics
+        self.max_queries = max_queries
+        self.max_connections = max_connections
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                route = _route_label(scope)
+                self.metrics.observe_queries(scope['method'], route, stats.queries, stats.total_time)
+                if stats.queries > self.max_queries or stats.connections > self.max_connections:
+                    logging.warning(f"Query budget exceeded by {scope['method']} {route}: {stats.summary()}")
+
+
+route_metrics = RouteMetrics()
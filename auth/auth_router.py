@@ -1,35 +1,47 @@
 from fastapi import APIRouter, HTTPException, Response
 from auth.models.models import RegisterUser, LoginUser
 from db.auth_repository import auth_repository
-from passlib.context import CryptContext
+from db.dependencies import UnitOfWorkRoute, auth_repository_dependency
+from auth.password_hasher import password_hasher
 from datetime import timedelta
 from auth.core_functions import user_dependency
 from auth.core_functions import create_jwt_token
 import logging
 logging.basicConfig()
 
-bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
-
 auth_router = APIRouter(
     prefix = '/api/auth',
+    route_class=UnitOfWorkRoute
 )
 
 @auth_router.post('/register')
-async def register_user(user: RegisterUser):
+async def register_user(user: RegisterUser, auth_repository: auth_repository_dependency):
+    try:
+        password_hash = await password_hasher.hash(user.password)
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail='Service busy, try again later')
+
     user_dict = {
         'username': user.username,
-        'password': bcrypt_context.hash(user.password),
+        'password': password_hash,
         'role': user.role.value  
     }
     return await auth_repository.register_user(user_dict)
 
 @auth_router.post('/login')
 async def login_user(user: LoginUser, response: Response):
+    # not the request's unit of work: it would keep a pooled connection
+    # checked out for the whole bcrypt verification below
     checked_user = await auth_repository.get_user(login=user.username)
     if not checked_user:
         raise HTTPException(status_code=401, detail='Not authenticated')
     
-    if not bcrypt_context.verify(user.password, checked_user['password_hash']):
+    try:
+        verified = await password_hasher.verify(user.password, checked_user['password_hash'])
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail='Service busy, try again later')
+
+    if not verified:
         raise HTTPException(status_code=401, detail='Not authenticated')
 
     token = await create_jwt_token(
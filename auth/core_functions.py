@@ -3,7 +3,7 @@ from config import SECRET, ALGORITHM
 from jose import jwt, JWTError
 from fastapi import HTTPException, Depends, status 
 from fastapi.params import Cookie
-from db.auth_repository import auth_repository
+from db.dependencies import auth_repository_dependency
 from typing import Optional, Annotated
 from db.model import User
 import logging 
@@ -15,7 +15,10 @@ async def create_jwt_token(login: str, user_id: int, role: str, expires_delta: t
     encode.update({'exp': expires})
     return jwt.encode(encode, SECRET, algorithm=ALGORITHM)
 
-async def get_current_user(token: Optional[str] = Cookie(alias='access_token', default='')):
+async def get_current_user(
+    auth_repository: auth_repository_dependency,
+    token: Optional[str] = Cookie(alias='access_token', default='')
+):
     logging.info(f'Token from cookie:{token}')
     if not token:
         raise HTTPException(
@@ -41,13 +44,19 @@ async def get_current_user(token: Optional[str] = Cookie(alias='access_token', d
                 detail="Token expired",
             )
 
+        user_id: str = payload.get("id")
+        user = auth_repository.get_cached_user(user_id, username)
+        if user:
+            return user
+
         user = await auth_repository.get_user(username)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found",
             )
-        
+
+        auth_repository.cache_user(user, expires_at=expire)
         return user
         
     except JWTError as e:
@@ -0,0 +1,110 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from passlib.context import CryptContext
+from typing import Any, Dict, Optional
+from config import (
+    PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_CONCURRENCY, PASSWORD_HASH_TIMEOUT
+)
+import asyncio
+import time
+
+bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+
+
+def _hash(password: str) -> str:
+    return bcrypt_context.hash(password)
+
+
+def _verify(password: str, password_hash: str) -> bool:
+    return bcrypt_context.verify(password, password_hash)
+
+
+class PasswordHasher:
+    def __init__(self, executor: str = 'thread', workers: int = 4,
+                 concurrency: int = 8, timeout: float = 5.0):
+        self.executor_kind = executor
+        self.workers = workers
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.total_wait_time = 0.0
+        self.total_run_time = 0.0
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix='password-hasher'
+                )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        queued_at = time.monotonic()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise TimeoutError("Password hashing queue is full")
+        finally:
+            self.waiting -= 1
+
+        started_at = time.monotonic()
+        self.total_wait_time += started_at - queued_at
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._get_executor(), fn, *args)
+            remaining = max(self.timeout - (started_at - queued_at), 0)
+            return await asyncio.wait_for(future, timeout=remaining)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise TimeoutError("Password hashing timed out")
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_run_time += time.monotonic() - started_at
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(_verify, password, password_hash)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'executor': self.executor_kind,
+            'workers': self.workers,
+            'concurrency': self.concurrency,
+            'waiting': self.waiting,
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'timeouts': self.timeouts,
+            'avg_wait_time': self.total_wait_time / self.completed if self.completed else 0.0,
+            'avg_run_time': self.total_run_time / self.completed if self.completed else 0.0
+        }
+
+
+password_hasher = PasswordHasher(
+    executor=PASSWORD_HASH_EXECUTOR,
+    workers=PASSWORD_HASH_WORKERS,
+    concurrency=PASSWORD_HASH_CONCURRENCY,
+    timeout=PASSWORD_HASH_TIMEOUT
+)
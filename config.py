@@ -9,4 +9,38 @@ DB_HOST = os.environ.get("DB_HOST")
 DB_USER = os.environ.get("DB_USER")
 DB_PORT = os.environ.get("DB_PORT")
 SECRET = os.environ.get("SECRET")
-ALGORITHM = os.environ.get("ALGORITHM")
\ No newline at end of file
+ALGORITHM = os.environ.get("ALGORITHM")
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", 10000))
+USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", 300))
+PASSWORD_HASH_EXECUTOR = os.environ.get("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 4))
+PASSWORD_HASH_CONCURRENCY = int(os.environ.get("PASSWORD_HASH_CONCURRENCY", 8))
+PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 5))
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_POOL_USE_LIFO = os.environ.get("DB_POOL_USE_LIFO", "false").lower() in ("1", "true", "yes")
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", 100))
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_PREPARED_STATEMENT_CACHE_SIZE", 100))
+DB_COMMAND_TIMEOUT = float(os.environ.get("DB_COMMAND_TIMEOUT", 60))
+PRODUCT_CACHE_ENABLED = os.environ.get("PRODUCT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+PRODUCT_CACHE_SIZE = int(os.environ.get("PRODUCT_CACHE_SIZE", 50000))
+PRODUCT_CACHE_TTL = float(os.environ.get("PRODUCT_CACHE_TTL", 60))
+CATALOG_SNAPSHOT_ENABLED = os.environ.get("CATALOG_SNAPSHOT_ENABLED", "true").lower() in ("1", "true", "yes")
+CATALOG_CHANNEL = os.environ.get("CATALOG_CHANNEL", "catalog_changes")
+CATALOG_VERIFY_INTERVAL = float(os.environ.get("CATALOG_VERIFY_INTERVAL", 30))
+CATALOG_PUBLISH_INTERVAL = float(os.environ.get("CATALOG_PUBLISH_INTERVAL", 0.2))
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+QUERY_LOG_ENABLED = os.environ.get("QUERY_LOG_ENABLED", "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 200))
+REQUEST_MAX_QUERIES = int(os.environ.get("REQUEST_MAX_QUERIES", 20))
+REQUEST_MAX_CONNECTIONS = int(os.environ.get("REQUEST_MAX_CONNECTIONS", 1))
+DB_REPLICA_URLS = [url.strip() for url in os.environ.get("DB_REPLICA_URLS", "").split(",") if url.strip()]
+DB_REPLICA_RETRY_INTERVAL = float(os.environ.get("DB_REPLICA_RETRY_INTERVAL", 30))
+DB_REPLICA_STICKY_SECONDS = int(os.environ.get("DB_REPLICA_STICKY_SECONDS", 5))
+IDEMPOTENCY_KEY_TTL = float(os.environ.get("IDEMPOTENCY_KEY_TTL", 86400))
+IDEMPOTENCY_CACHE_SIZE = int(os.environ.get("IDEMPOTENCY_CACHE_SIZE", 10000))
+IDEMPOTENCY_CACHE_TTL = float(os.environ.get("IDEMPOTENCY_CACHE_TTL", 600))
+IDEMPOTENCY_CLEANUP_INTERVAL = float(os.environ.get("IDEMPOTENCY_CLEANUP_INTERVAL", 3600))
@@ -1,19 +1,33 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from uuid import UUID
-from datetime import datetime
+from datetime import date, datetime
 
 class AbstractRepository(ABC):
     
     # --- Product Operations ---
     @abstractmethod
-    async def get_products(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    async def get_products(self, skip: int = 0, limit: int = 100,
+                           cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        pass
+    
+    @abstractmethod
+    async def get_catalog_version(self) -> str:
         pass
     
     @abstractmethod
     async def get_product(self, product_id: UUID) -> Optional[Dict[str, Any]]:
         pass
     
+    @abstractmethod
+    async def search_products(self, query: str, limit: int = 20,
+                              prefix: bool = False) -> List[Dict[str, Any]]:
+        pass
+    
+    @abstractmethod
+    async def get_products_by_ids(self, product_ids: List[UUID]) -> List[Dict[str, Any]]:
+        pass
+    
     @abstractmethod
     async def create_product(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
         pass
@@ -31,15 +45,48 @@ class AbstractRepository(ABC):
     async def delete_product(self, product_id: UUID) -> bool:
         pass
     
+    @abstractmethod
+    async def import_products(self, batches: AsyncIterator[List[Dict[str, Any]]]) -> int:
+        pass
+    
     # --- Transaction Operations ---
     @abstractmethod
     async def create_transaction_with_items(self, transaction_data: Dict[str, Any]) -> Dict[str, Any]:
         pass
     
+    @abstractmethod
+    async def create_transaction_idempotent(self, transaction_data: Dict[str, Any],
+                                            idempotency_key: str,
+                                            request_hash: str) -> Tuple[Dict[str, Any], bool]:
+        pass
+    
+    @abstractmethod
+    async def create_transactions_batch(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        pass
+    
     @abstractmethod
     async def get_transactions_with_items(self, skip: int = 0, limit: int = 100, 
                              start_date: Optional[datetime] = None, 
-                             end_date: Optional[datetime] = None) -> List[Dict[str, Any]]:
+                             end_date: Optional[datetime] = None,
+                             cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        pass
+    
+    @abstractmethod
+    def stream_transactions_with_items(self, start_date: Optional[datetime] = None,
+                                       end_date: Optional[datetime] = None,
+                                       batch_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        pass
+    
+    @abstractmethod
+    async def get_sales_report(self, group_by: str = 'day',
+                               start_date: Optional[datetime] = None,
+                               end_date: Optional[datetime] = None,
+                               status: str = 'paid') -> List[Dict[str, Any]]:
+        pass
+    
+    @abstractmethod
+    async def rebuild_sales_rollup(self, start_date: Optional[date] = None,
+                                   end_date: Optional[date] = None) -> int:
         pass
     
     @abstractmethod
@@ -48,7 +95,12 @@ class AbstractRepository(ABC):
     
     @abstractmethod
     async def update_transaction(self, transaction_id: UUID, 
-                               update_data: Dict[str, Any]) -> Dict[str, Any]:
+                               update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def update_transactions_status(self, transaction_ids: List[UUID],
+                                         status: str) -> Dict[str, Any]:
         pass
     
     @abstractmethod
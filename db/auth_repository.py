@@ -6,13 +6,28 @@ from datetime import datetime
 from fastapi import HTTPException
 from typing import Optional
 from enum import Enum
-from db.db_connection import async_session
+from db.db_connection import async_session, replicas
+from db.cache import TTLCache
+from db.query_log import instrumented
+from db.replicas import ReplicaSet, read_session, replica_read
+from config import USER_CACHE_SIZE, USER_CACHE_TTL
+import time
 import logging
 logging.basicConfig()
 
+@instrumented
 class AuthRepository(AbstractAuthRepository):
-    def __init__(self, db):
+    def __init__(self, db, user_cache: Optional[TTLCache] = None,
+                 replicas: Optional[ReplicaSet] = None):
         self.db = db
+        self.replicas = replicas
+        self.user_cache = user_cache if user_cache is not None else TTLCache(
+            maxsize=USER_CACHE_SIZE,
+            ttl=USER_CACHE_TTL
+        )
+
+    def bind(self, db) -> 'AuthRepository':
+        return AuthRepository(db, user_cache=self.user_cache, replicas=self.replicas)
         
     async def register_user(self, user_dict: dict):
             async with self.db.begin() as session:
@@ -23,13 +38,15 @@ class AuthRepository(AbstractAuthRepository):
                         role=user_dict['role']
                     )
                     session.add(user)
+                    await session.flush()
                     return {'status': '201', 'detail': 'user created'}
                 except Exception as e:
                     await session.rollback()
                     raise HTTPException(status_code=500, detail=f"Error: {e}")
     
+    @replica_read
     async def get_user(self, login: str) -> Optional[dict]:
-        async with self.db.begin() as session:
+        async with read_session(self.db, self.replicas) as session:
             try:
                 stmt = select(User).where(User.username == login)
                 user = await session.scalar(stmt)  
@@ -46,5 +63,18 @@ class AuthRepository(AbstractAuthRepository):
                 }
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Error: {e}")
+
+    def get_cached_user(self, user_id: str, login: str) -> Optional[dict]:
+        user = self.user_cache.get(user_id)
+        if user is None or user['username'] != login:
+            return None
+        return user
+
+    def cache_user(self, user: dict, expires_at: Optional[int] = None) -> None:
+        ttl = expires_at - time.time() if expires_at else None
+        self.user_cache.set(user['id'], user, ttl=ttl)
+
+    def invalidate_user(self, user_id: str) -> None:
+        self.user_cache.invalidate(str(user_id))
     
-auth_repository = AuthRepository(async_session)
\ No newline at end of file
+auth_repository = AuthRepository(async_session, replicas=replicas)
\ No newline at end of file
@@ -0,0 +1,351 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import select, text
+from db.model import Product
+import asyncio
+import asyncpg
+import json
+import logging
+
+CATALOG_VERSION_SEQUENCE = 'catalog_version_seq'
+
+
+def product_delta(product) -> Dict[str, Any]:
+    return {
+        'op': 'upsert',
+        'id': str(product.id),
+        'name': product.name,
+        'price': str(product.price),
+        'quantity': str(product.quantity),
+        'created_at': product.created_at.isoformat() if product.created_at else None,
+        'version': product.version
+    }
+
+
+def deleted_delta(product_id, version: int) -> Dict[str, Any]:
+    return {'op': 'delete', 'id': str(product_id), 'version': version}
+
+
+def reload_delta() -> Dict[str, Any]:
+    return {'op': 'reload'}
+
+
+class CatalogSnapshot:
+    def __init__(self, db, dsn: str, channel: str = 'catalog_changes',
+                 verify_interval: float = 30.0, publish_interval: float = 0.2):
+        self.db = db
+        self.dsn = dsn
+        self.channel = channel
+        self.verify_interval = verify_interval
+        self.publish_interval = publish_interval
+        self.ready = False
+        self.products: Dict[UUID, Dict[str, Any]] = {}
+        self.max_version = 0
+        self.version_sum = 0
+        self.removed_version_sum = 0
+        self.reloads = 0
+        self.deltas_applied = 0
+        self.loaded_at: Optional[datetime] = None
+        self._keys: List[tuple] = []
+        self._deleted: Dict[UUID, int] = {}
+        self._pending: Optional[List[Dict[str, Any]]] = None
+        self._reload_requested = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._connection = None
+        self._outbox: List[Dict[str, Any]] = []
+        self._publish_task: Optional[asyncio.Task] = None
+        self.deltas_published = 0
+
+    @staticmethod
+    def _sort_key(product: Dict[str, Any]) -> tuple:
+        return (-product['_price'], -product['id'].int)
+
+    def _public(self, product: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'id': product['id'],
+            'name': product['name'],
+            'price': float(product['_price']),
+            'quantity': float(product['_quantity']),
+            'created_at': product['created_at'],
+            'version': product['version']
+        }
+
+    def version(self) -> str:
+        # versions are taken before commit, so max(version) can stay put when
+        # an older write commits late; the sum moves with every row that changes
+        return f"{len(self.products)}.{self.version_sum}"
+
+    def get(self, product_id: UUID) -> Optional[Dict[str, Any]]:
+        product = self.products.get(product_id)
+        return self._public(product) if product is not None else None
+
+    def get_price(self, product_id: UUID) -> Optional[Dict[str, Any]]:
+        return self.products.get(product_id)
+
+    def page(self, skip: int = 0, limit: int = 100,
+             after: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        if after is not None:
+            price, product_id = after
+            start = bisect_right(self._keys, (-price, -product_id.int, product_id))
+        else:
+            start = skip
+        return [
+            self._public(self.products[key[2]])
+            for key in self._keys[start:start + limit]
+        ]
+
+    def _store(self, product: Dict[str, Any]) -> None:
+        previous = self.products.get(product['id'])
+        if previous is not None:
+            self.version_sum -= previous['version']
+            if previous['_price'] != product['_price']:
+                self._remove_key(previous)
+                insort(self._keys, self._sort_key(product) + (product['id'],))
+        else:
+            insort(self._keys, self._sort_key(product) + (product['id'],))
+        self.products[product['id']] = product
+        self.version_sum += product['version']
+        self.max_version = max(self.max_version, product['version'])
+
+    def _remove_key(self, product: Dict[str, Any]) -> None:
+        key = self._sort_key(product) + (product['id'],)
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+
+    def apply(self, delta: Dict[str, Any]) -> None:
+        if delta['op'] == 'reload':
+            self._reload_requested.set()
+            return
+        if self._pending is not None:
+            self._pending.append(delta)
+            return
+
+        product_id = UUID(delta['id'])
+        version = delta['version']
+        current = self.products.get(product_id)
+        if (current is not None and current['version'] >= version) or \
+                self._deleted.get(product_id, 0) >= version:
+            return
+
+        if delta['op'] == 'delete':
+            self._deleted[product_id] = version
+            if current is not None:
+                self._remove_key(current)
+                del self.products[product_id]
+                self.version_sum -= current['version']
+                self.removed_version_sum += current['version']
+                if current['version'] == self.max_version:
+                    self.max_version = max(
+                        (product['version'] for product in self.products.values()),
+                        default=0
+                    )
+        else:
+            self._store({
+                'id': product_id,
+                'name': delta['name'],
+                '_price': Decimal(delta['price']),
+                '_quantity': Decimal(delta['quantity']),
+                'created_at': datetime.fromisoformat(delta['created_at']) if delta['created_at'] else None,
+                'version': version
+            })
+        self.deltas_applied += 1
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        try:
+            self.apply(json.loads(payload))
+        except (ValueError, KeyError) as e:
+            logging.warning(f'Catalog: bad delta {payload!r}: {e}, reloading')
+            self._reload_requested.set()
+
+    async def load(self) -> None:
+        self._pending = []
+        try:
+            async with self.db.begin() as session:
+                result = await session.execute(select(
+                    Product.id, Product.name, Product.price, Product.quantity,
+                    Product.created_at, Product.version
+                ))
+                rows = result.all()
+
+            products = {}
+            keys = []
+            max_version = 0
+            version_sum = 0
+            for row in rows:
+                product = {
+                    'id': row.id,
+                    'name': row.name,
+                    '_price': row.price,
+                    '_quantity': row.quantity,
+                    'created_at': row.created_at,
+                    'version': row.version
+                }
+                products[row.id] = product
+                keys.append(self._sort_key(product) + (row.id,))
+                max_version = max(max_version, row.version)
+                version_sum += row.version
+            keys.sort()
+
+            self.products = products
+            self._keys = keys
+            self._deleted = {}
+            self.max_version = max_version
+            self.version_sum = version_sum
+        finally:
+            pending, self._pending = self._pending, None
+
+        for delta in pending:
+            self.apply(delta)
+        self.ready = True
+        self.reloads += 1
+        self.loaded_at = datetime.utcnow()
+        logging.info(f'Catalog: loaded {len(self.products)} products at version {self.max_version}')
+
+    async def _read_version(self) -> Dict[str, int]:
+        row = await self._connection.fetchrow(
+            'SELECT count(*) AS products, coalesce(sum(version), 0) AS version_sum FROM products'
+        )
+        return {'products': row['products'], 'version_sum': int(row['version_sum'])}
+
+    def matches(self, reading: Dict[str, int]) -> bool:
+        # the sum catches a missed delta for any row, not just the newest one
+        return reading['products'] == len(self.products) and reading['version_sum'] == self.version_sum
+
+    def caught_up(self, reading: Dict[str, int], removed_before: int) -> bool:
+        """Whether the snapshot has absorbed everything committed when `reading` was taken.
+
+        Checkout deltas reach other workers up to a publish interval late, so
+        under steady sales the live database is nearly always ahead of the
+        snapshot and an exact match proves nothing. Row versions only grow, so
+        once those deltas arrive the sum can only fall below the earlier
+        reading through deletes, which are added back here.
+        """
+        removed_since = self.removed_version_sum - removed_before
+        return self.version_sum + removed_since >= reading['version_sum']
+
+    async def _verify(self) -> bool:
+        reading = await self._read_version()
+        if self.matches(reading):
+            return True
+        removed_before = self.removed_version_sum
+        # give queued and in-flight deltas one publish window to arrive
+        await asyncio.sleep(self.publish_interval + 1)
+        return self.caught_up(reading, removed_before)
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                self._connection = await asyncpg.connect(self.dsn)
+                await self._connection.add_listener(self.channel, self._on_notification)
+                # cleared before each load, so a reload requested while one runs is not lost
+                self._reload_requested.clear()
+                await self.load()
+                backoff = 1.0
+                while True:
+                    try:
+                        await asyncio.wait_for(self._reload_requested.wait(), timeout=self.verify_interval)
+                        self._reload_requested.clear()
+                        await self.load()
+                        continue
+                    except asyncio.TimeoutError:
+                        pass
+                    if not await self._verify():
+                        logging.warning('Catalog: snapshot diverged from database, reloading')
+                        self._reload_requested.clear()
+                        await self.load()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.ready = False
+                logging.warning(f'Catalog: listener failed: {e}, retrying in {backoff:.0f}s')
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+            finally:
+                if self._connection is not None:
+                    try:
+                        await self._connection.close()
+                    except Exception:
+                        pass
+                    self._connection = None
+
+    @property
+    def publishing(self) -> bool:
+        return self._publish_task is not None
+
+    def queue(self, deltas: List[Dict[str, Any]]) -> None:
+        """Publish committed deltas with the next batch instead of in their own transaction.
+
+        Every NOTIFY takes a database-wide lock at commit, so stock changes
+        from checkouts are sent from here rather than from each sale. This
+        worker applies them at once; a batch lost with the worker is caught
+        by the other workers' periodic check.
+        """
+        for delta in deltas:
+            self.apply(delta)
+        self._outbox.extend(deltas)
+
+    async def _flush(self) -> None:
+        deltas, self._outbox = self._outbox, []
+        if not deltas:
+            return
+        try:
+            async with self.db.begin() as session:
+                await publish_catalog_changes(session, self.channel, deltas)
+            self.deltas_published += len(deltas)
+        except Exception as e:
+            logging.warning(f'Catalog: failed to publish {len(deltas)} deltas: {e}')
+
+    async def _run_publisher(self) -> None:
+        while True:
+            await asyncio.sleep(self.publish_interval)
+            await self._flush()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        if self._publish_task is None and self.publish_interval > 0:
+            self._publish_task = asyncio.create_task(self._run_publisher())
+
+    async def stop(self) -> None:
+        if self._publish_task is not None:
+            self._publish_task.cancel()
+            try:
+                await self._publish_task
+            except asyncio.CancelledError:
+                pass
+            self._publish_task = None
+            await self._flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.ready = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'ready': self.ready,
+            'products': len(self.products),
+            'max_version': self.max_version,
+            'reloads': self.reloads,
+            'deltas_applied': self.deltas_applied,
+            'deltas_published': self.deltas_published,
+            'deltas_queued': len(self._outbox),
+            'loaded_at': self.loaded_at.isoformat() if self.loaded_at else None
+        }
+
+
+async def publish_catalog_changes(session, channel: str, deltas: List[Dict[str, Any]]) -> None:
+    if not deltas:
+        return
+    await session.execute(
+        text('SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload'),
+        {'channel': channel, 'payloads': [json.dumps(delta) for delta in deltas]}
+    )
@@ -3,12 +3,57 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import Session
 import logging
-from config import DB_PASS, DB_HOST, DB_PORT, DB_NAME, DB_USER
+from config import (
+    DB_PASS, DB_HOST, DB_PORT, DB_NAME, DB_USER,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING, DB_POOL_USE_LIFO, DB_STATEMENT_CACHE_SIZE,
+    DB_PREPARED_STATEMENT_CACHE_SIZE, DB_COMMAND_TIMEOUT,
+    QUERY_LOG_ENABLED, SLOW_QUERY_MS,
+    DB_REPLICA_URLS, DB_REPLICA_RETRY_INTERVAL
+)
+from db.pool import InstrumentedPool
+from db.query_log import install_query_log
+from db.replicas import Replica, ReplicaSet
 
 logging.basicConfig(level=logging.INFO)
 
 DB_URL = f'postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
 
-engine = create_async_engine(DB_URL)
 
-async_session = async_sessionmaker(bind= engine, expire_on_commit=False)
\ No newline at end of file
+def _create_engine(url: str, replica: bool = False):
+    separator = '&' if '?' in url else '?'
+    engine = create_async_engine(
+        f'{url}{separator}prepared_statement_cache_size={DB_PREPARED_STATEMENT_CACHE_SIZE}',
+        poolclass=InstrumentedPool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_use_lifo=DB_POOL_USE_LIFO,
+        connect_args={
+            'statement_cache_size': DB_STATEMENT_CACHE_SIZE,
+            'command_timeout': DB_COMMAND_TIMEOUT
+        }
+    )
+    if QUERY_LOG_ENABLED:
+        install_query_log(engine, slow_query_threshold=SLOW_QUERY_MS / 1000, replica=replica)
+    return engine
+
+
+engine = _create_engine(DB_URL)
+
+async_session = async_sessionmaker(bind= engine, expire_on_commit=False)
+
+replica_engines = [_create_engine(url, replica=True) for url in DB_REPLICA_URLS]
+
+replicas = ReplicaSet(
+    [
+        Replica(
+            f'{replica_engine.url.host}:{replica_engine.url.port or 5432}',
+            replica_engine,
+            async_sessionmaker(bind=replica_engine, expire_on_commit=False)
+        ) for replica_engine in replica_engines
+    ],
+    retry_interval=DB_REPLICA_RETRY_INTERVAL
+) if replica_engines else None
@@ -0,0 +1,89 @@
+from typing import Annotated, Callable
+from fastapi import Depends, Request, Response
+from fastapi.routing import APIRoute
+from db.db_connection import async_session, replicas
+from db.replicas import primary_reads
+from config import DB_REPLICA_STICKY_SECONDS
+from db.unit_of_work import UnitOfWork
+from db.repository import Repository, repository
+from db.auth_repository import AuthRepository, auth_repository
+
+
+class UnitOfWorkRoute(APIRoute):
+    """Runs each request in one UnitOfWork, committed before the response is sent.
+
+    Committing here rather than in a yield dependency keeps the commit ahead
+    of the response whatever order FastAPI tears dependencies down in, so a
+    client never sees a success for a transaction that later fails to commit.
+    Responses with an error status are rolled back.
+
+    With read replicas configured, a request that wrote to the primary gets a
+    short-lived read_primary cookie, and requests carrying it (or an
+    X-Read-Primary header) send their reads to the primary too.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def unit_of_work_handler(request: Request) -> Response:
+            unit_of_work = UnitOfWork(async_session)
+            request.state.unit_of_work = unit_of_work
+            read_primary = replicas is not None and (
+                'read_primary' in request.cookies or 'x-read-primary' in request.headers
+            )
+            try:
+                try:
+                    if read_primary:
+                        with primary_reads():
+                            response = await handler(request)
+                    else:
+                        response = await handler(request)
+                except BaseException:
+                    await unit_of_work.rollback()
+                    raise
+                if response.status_code < 400:
+                    wrote = (
+                        replicas is not None and DB_REPLICA_STICKY_SECONDS > 0
+                        and not unit_of_work.failed and await unit_of_work.has_writes()
+                    )
+                    await unit_of_work.commit()
+                    if wrote:
+                        response.set_cookie(
+                            'read_primary', '1',
+                            max_age=DB_REPLICA_STICKY_SECONDS,
+                            path='/',
+                            httponly=True,
+                            samesite='lax'
+                        )
+                else:
+                    await unit_of_work.rollback()
+                return response
+            finally:
+                await unit_of_work.close()
+
+        return unit_of_work_handler
+
+
+# the dependencies are async so FastAPI resolves them inline instead of in its threadpool
+async def get_unit_of_work(request: Request) -> UnitOfWork:
+    unit_of_work = getattr(request.state, 'unit_of_work', None)
+    if unit_of_work is None:
+        raise RuntimeError(f'{request.url.path} is not served by a UnitOfWorkRoute')
+    return unit_of_work
+
+
+async def get_repository(unit_of_work: Annotated[UnitOfWork, Depends(get_unit_of_work)]) -> Repository:
+    return repository.bind(unit_of_work)
+
+
+async def get_auth_repository(request: Request) -> AuthRepository:
+    # user_dependency is used outside UnitOfWorkRoute too; user lookups are
+    # read-only, so there the shared repository opens its own session
+    unit_of_work = getattr(request.state, 'unit_of_work', None)
+    if unit_of_work is None:
+        return auth_repository
+    return auth_repository.bind(unit_of_work)
+
+
+repository_dependency = Annotated[Repository, Depends(get_repository)]
+auth_repository_dependency = Annotated[AuthRepository, Depends(get_auth_repository)]
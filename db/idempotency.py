@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+
+
+class IdempotencyKeyMismatch(ValueError):
+    pass
+
+
+class IdempotencyKeyPurger:
+    """Periodically deletes idempotency keys older than the key TTL."""
+
+    def __init__(self, repository, ttl: float, interval: float):
+        self.repository = repository
+        self.ttl = ttl
+        self.interval = interval
+        self.purged = 0
+        self.last_run: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def purge(self) -> int:
+        deleted = await self.repository.purge_idempotency_keys(
+            datetime.utcnow() - timedelta(seconds=self.ttl)
+        )
+        self.purged += deleted
+        self.last_run = datetime.utcnow()
+        return deleted
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.purge()
+            except Exception as e:
+                logging.warning(f'Idempotency key cleanup failed: {e}')
+
+    async def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'ttl': self.ttl,
+            'interval': self.interval,
+            'purged': self.purged,
+            'last_run': self.last_run.isoformat() if self.last_run else None
+        }
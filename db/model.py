@@ -1,22 +1,26 @@
 from datetime import datetime
 from sqlalchemy import (
-    Column, String, DateTime, Integer, 
-    ForeignKey, Table, Numeric, UUID
+    Column, String, DateTime, Integer, SmallInteger, Date, BigInteger,
+    ForeignKey, Table, Numeric, UUID, Index, Sequence, func, text
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.dialects.postgresql import ENUM
+from sqlalchemy.dialects.postgresql import ENUM, JSONB
 from enum import Enum as PyEnum
 import uuid
 
 Base = declarative_base()
 
+catalog_version_seq = Sequence('catalog_version_seq', metadata=Base.metadata)
+
 transaction_product = Table(
     'transaction_product',
     Base.metadata,
     Column('transaction_id', UUID(as_uuid=True), ForeignKey('transactions.id'), primary_key=True),
     Column('product_id', UUID(as_uuid=True), ForeignKey('products.id'), primary_key=True),
-    Column('quantity', Numeric(10, 2), nullable=False)  
+    Column('quantity', Numeric(10, 2), nullable=False),
+    Column('price', Numeric(10, 2), nullable=True),
+    Index('ix_transaction_product_product_id', 'product_id')
 )
 
 class Product(Base):
@@ -27,6 +31,12 @@ class Product(Base):
     price = Column(Numeric(10, 2), nullable=False)
     quantity = Column(Numeric(10, 2), nullable=False, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
+    version = Column(
+        BigInteger,
+        nullable=False,
+        index=True,
+        server_default=text("nextval('catalog_version_seq')")
+    )
 
     transactions = relationship(
         "Transaction",
@@ -34,11 +44,24 @@ class Product(Base):
         back_populates="products"
     )
 
+Index('ix_products_price_id', Product.price.desc(), Product.id.desc())
+Index(
+    'ix_products_name_trgm_gist',
+    func.lower(Product.name).label('name_lower'),
+    postgresql_using='gist',
+    postgresql_ops={'name_lower': 'gist_trgm_ops'}
+)
+Index(
+    'ix_products_name_prefix',
+    func.lower(Product.name).label('name_lower'),
+    postgresql_ops={'name_lower': 'text_pattern_ops'}
+)
+
 class Transaction(Base):
     __tablename__ = 'transactions'
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    cashier_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False) 
+    cashier_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False, index=True)
     total_price = Column(Numeric(10, 2), nullable=False)
     status = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -51,6 +74,8 @@ class Transaction(Base):
         back_populates="transactions"
     )
 
+Index('ix_transactions_created_at_id', Transaction.created_at.desc(), Transaction.id.desc())
+
 class User(Base):
     __tablename__ = 'users'
 
@@ -60,4 +85,28 @@ class User(Base):
     role = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    transactions = relationship("Transaction", back_populates="cashier")
\ No newline at end of file
+    transactions = relationship("Transaction", back_populates="cashier")
+
+class DailyProductSales(Base):
+    __tablename__ = 'daily_product_sales'
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(UUID(as_uuid=True), ForeignKey('products.id'), primary_key=True)
+    units = Column(Numeric(14, 2), nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+    tickets = Column(Integer, nullable=False, default=0)
+
+class DailySales(Base):
+    __tablename__ = 'daily_sales'
+
+    day = Column(Date, primary_key=True)
+    shard = Column(SmallInteger, primary_key=True, default=0, server_default='0')
+    tickets = Column(Integer, nullable=False, default=0)
+
+class IdempotencyKey(Base):
+    __tablename__ = 'idempotency_keys'
+
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    response = Column(JSONB, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
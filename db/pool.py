@@ -0,0 +1,53 @@
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import Any, Dict
+import time
+
+
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def record_checkout(self, wait_time: float) -> None:
+        self.checkouts += 1
+        self.total_wait_time += wait_time
+        if wait_time > self.max_wait_time:
+            self.max_wait_time = wait_time
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.checkout_timeouts += 1
+            raise
+        self.stats.record_checkout(time.perf_counter() - started_at)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def snapshot(self) -> Dict[str, Any]:
+        stats = self.stats
+        return {
+            'pool_size': self.size(),
+            'max_overflow': self._max_overflow,
+            'checked_in': self.checkedin(),
+            'checked_out': self.checkedout(),
+            'overflow': max(self.overflow(), 0),
+            'checkouts': stats.checkouts,
+            'checkout_timeouts': stats.checkout_timeouts,
+            'avg_wait_time': stats.total_wait_time / stats.checkouts if stats.checkouts else 0.0,
+            'max_wait_time': stats.max_wait_time
+        }
@@ -0,0 +1,137 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, Iterator, Optional, Tuple
+from sqlalchemy import event
+import inspect
+import logging
+import time
+
+
+class QueryStats:
+    def __init__(self):
+        self.queries = 0
+        self.total_time = 0.0
+        self.connections = 0
+        self.replica_connections = 0
+        self.methods: Dict[str, int] = {}
+
+    def record_query(self, duration: float, method: Optional[str]) -> None:
+        self.queries += 1
+        self.total_time += duration
+        if method is not None:
+            self.methods[method] = self.methods.get(method, 0) + 1
+
+    def summary(self) -> str:
+        methods = ', '.join(f'{method} x{count}' for method, count in self.methods.items())
+        return (
+            f'{self.queries} queries in {self.total_time * 1000:.1f} ms '
+            f'over {self.connections} primary and {self.replica_connections} replica connections '
+            f'({methods or "no repository method"})'
+        )
+
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar('request_query_stats', default=None)
+_repository_methods: ContextVar[Tuple[str, ...]] = ContextVar('repository_methods', default=())
+
+totals = {'queries': 0, 'slow_queries': 0, 'total_time': 0.0}
+
+
+def current_method() -> Optional[str]:
+    methods = _repository_methods.get()
+    return ' > '.join(methods) if methods else None
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+def _wrap_method(name: str, method):
+    if inspect.isasyncgenfunction(method):
+        @wraps(method)
+        async def generator_wrapper(*args, **kwargs):
+            generator = method(*args, **kwargs)
+            try:
+                while True:
+                    # set around each step only: the caller's context is active between yields
+                    token = _repository_methods.set(_repository_methods.get() + (name,))
+                    try:
+                        item = await generator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        _repository_methods.reset(token)
+                    yield item
+            finally:
+                await generator.aclose()
+        return generator_wrapper
+
+    @wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = _repository_methods.set(_repository_methods.get() + (name,))
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            _repository_methods.reset(token)
+    return wrapper
+
+
+def instrumented(cls):
+    """Tag the SQL issued by each public async method with the method name."""
+    for name, method in list(vars(cls).items()):
+        if name.startswith('_'):
+            continue
+        if inspect.iscoroutinefunction(method) or inspect.isasyncgenfunction(method):
+            setattr(cls, name, _wrap_method(f'{cls.__name__}.{name}', method))
+    return cls
+
+
+def install_query_log(engine, slow_query_threshold: float, replica: bool = False) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, 'engine_connect')
+    def on_connect(connection):
+        stats = _request_stats.get()
+        if stats is None:
+            return
+        # the connection budget is about the primary; replica reads are reported apart
+        if replica:
+            stats.replica_connections += 1
+        else:
+            stats.connections += 1
+
+    @event.listens_for(sync_engine, 'before_cursor_execute')
+    def before_execute(connection, cursor, statement, parameters, context, executemany):
+        connection.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, 'handle_error')
+    def on_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get('query_started_at'):
+            connection.info['query_started_at'].pop()
+
+    @event.listens_for(sync_engine, 'after_cursor_execute')
+    def after_execute(connection, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - connection.info['query_started_at'].pop()
+        method = current_method()
+        totals['queries'] += 1
+        totals['total_time'] += duration
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.record_query(duration, method)
+        if duration >= slow_query_threshold:
+            totals['slow_queries'] += 1
+            logging.warning(
+                f'Slow query: {duration * 1000:.1f} ms in {method or "unknown"}: '
+                f'{" ".join(statement.split())}'
+            )
+
+
+def query_totals() -> Dict[str, Any]:
+    return dict(totals)
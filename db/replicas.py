@@ -0,0 +1,147 @@
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+import asyncio
+import asyncpg
+import inspect
+import logging
+import time
+
+_primary_reads: ContextVar[bool] = ContextVar('primary_reads', default=False)
+
+
+class ReplicaUnavailable(Exception):
+    pass
+
+
+class Replica:
+    def __init__(self, name: str, engine, session_factory: async_sessionmaker):
+        self.name = name
+        self.engine = engine
+        self.session_factory = session_factory
+        self.down_until = 0.0
+        self.reads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+
+class ReplicaSet:
+    def __init__(self, replicas: List[Replica], retry_interval: float = 30.0):
+        self.replicas = replicas
+        self.retry_interval = retry_interval
+        self.primary_fallbacks = 0
+        self._next = 0
+
+    def pick(self) -> Optional[Replica]:
+        now = time.monotonic()
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next % len(self.replicas)]
+            self._next += 1
+            if replica.down_until <= now:
+                return replica
+        self.primary_fallbacks += 1
+        return None
+
+    def mark_down(self, replica: Replica, error: BaseException) -> None:
+        replica.failures += 1
+        replica.down_until = time.monotonic() + self.retry_interval
+        replica.last_error = str(error)
+        logging.warning(
+            f'Replica {replica.name} unavailable, reading from the primary '
+            f'for {self.retry_interval:.0f}s: {error}'
+        )
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        return [{
+            'name': replica.name,
+            'available': replica.down_until <= now,
+            'reads': replica.reads,
+            'failures': replica.failures,
+            'last_error': replica.last_error,
+            'pool': replica.engine.pool.snapshot()
+        } for replica in self.replicas]
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+
+def is_connection_error(error: Optional[BaseException], connecting: bool = False) -> bool:
+    """Whether the replica itself is unreachable, as opposed to busy or slow.
+
+    A timeout only counts while connecting: asyncpg raises the same error for
+    command_timeout, and a slow query would be just as slow on the next
+    server. An exhausted pool is not an outage either.
+    """
+    # repositories re-raise failures as ValueError, so look down the chain
+    while error is not None:
+        if isinstance(error, PoolTimeoutError):
+            return False
+        if isinstance(error, asyncio.TimeoutError):
+            # TimeoutError is an OSError on Python 3.11+, so decide before that check
+            return connecting
+        if isinstance(error, DBAPIError) and error.connection_invalidated:
+            return True
+        if isinstance(error, (
+            OSError, asyncpg.CannotConnectNowError, asyncpg.ConnectionDoesNotExistError
+        )):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+@asynccontextmanager
+async def read_session(db, replicas: Optional[ReplicaSet]) -> AsyncIterator[AsyncSession]:
+    """Session for a read-only repository call.
+
+    Uses a replica unless there are none available, the request asked to read
+    from the primary, or its unit of work already holds a primary transaction
+    (so it reads its own writes). A connection failure on the replica marks it
+    down and raises ReplicaUnavailable, which replica_read retries.
+    """
+    replica = None
+    if replicas is not None and not _primary_reads.get() and not getattr(db, 'on_primary', False):
+        replica = replicas.pick()
+    if replica is None:
+        async with db.begin() as session:
+            yield session
+        return
+
+    replica.reads += 1
+    connecting = True
+    try:
+        async with replica.session_factory.begin() as session:
+            session.info['replica'] = replica.name
+            await session.connection()
+            connecting = False
+            yield session
+    except Exception as e:
+        if not is_connection_error(e, connecting=connecting):
+            raise
+        replicas.mark_down(replica, e)
+        raise ReplicaUnavailable(f'Replica {replica.name} unavailable: {e}') from e
+
+
+def replica_read(method):
+    """Retry a read-only method when its replica fails; the next attempt skips it."""
+    if inspect.isasyncgenfunction(method):
+        # a stream may already have yielded rows, so it cannot be replayed
+        return method
+
+    @wraps(method)
+    async def wrapper(*args, **kwargs):
+        while True:
+            try:
+                return await method(*args, **kwargs)
+            except ReplicaUnavailable:
+                continue
+    return wrapper
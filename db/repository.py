@@ -1,42 +1,251 @@
 from db.abstract_repository import AbstractRepository
-from db.db_connection import async_session
-from sqlalchemy import select, insert, update, desc, delete
-from db.model import Product, User, Transaction, transaction_product
-from datetime import datetime
-from typing import List, Optional, Dict, Any
+from db.db_connection import async_session, replicas, DB_URL
+from sqlalchemy import event, select, insert, update, desc, delete, tuple_, values, column, func, Numeric, null, cast, case, literal_column, Date, DateTime
+from sqlalchemy import UUID as UUID_TYPE, ARRAY, Float, SmallInteger, any_, bindparam, literal
+from db.model import Product, User, Transaction, DailyProductSales, DailySales, IdempotencyKey, transaction_product
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from db.pagination import decode_cursor
+from db.cache import TTLCache
+from db.query_log import instrumented
+from db.replicas import ReplicaSet, read_session, replica_read
+from db.idempotency import IdempotencyKeyMismatch, IdempotencyKeyPurger
+from db.catalog import (
+    CatalogSnapshot, CATALOG_VERSION_SEQUENCE, product_delta,
+    deleted_delta, reload_delta, publish_catalog_changes
+)
+from config import (
+    PRODUCT_CACHE_ENABLED, PRODUCT_CACHE_SIZE, PRODUCT_CACHE_TTL,
+    CATALOG_SNAPSHOT_ENABLED, CATALOG_CHANNEL, CATALOG_VERIFY_INTERVAL, CATALOG_PUBLISH_INTERVAL,
+    IDEMPOTENCY_KEY_TTL, IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_CACHE_TTL,
+    IDEMPOTENCY_CLEANUP_INTERVAL
+)
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from uuid import UUID
+import json
+import random
 import uuid
 
+DAILY_SALES_SHARDS = 16
+
+ProductPrice = namedtuple('ProductPrice', ['id', 'name', 'price'])
+
+PRODUCT_COLUMNS = (Product.id, Product.name, Product.price, Product.quantity, Product.created_at)
+TRANSACTION_COLUMNS = (
+    Transaction.id, Transaction.cashier_id, Transaction.total_price,
+    Transaction.status, Transaction.created_at, Transaction.updated_at
+)
+ITEM_COLUMNS = (
+    transaction_product.c.product_id, Product.name, Product.price,
+    transaction_product.c.quantity
+)
+
+@instrumented
 class Repository(AbstractRepository):
-    def __init__(self,db):
+    def __init__(self,db, product_cache: Optional[TTLCache] = None,
+                 catalog: Optional[CatalogSnapshot] = None,
+                 catalog_channel: Optional[str] = None,
+                 replicas: Optional[ReplicaSet] = None,
+                 idempotency_cache: Optional[TTLCache] = None):
         self.db = db
+        self.replicas = replicas
+        self.idempotency_cache = idempotency_cache
+        self.product_cache = product_cache
+        self.catalog = catalog
+        self.catalog_channel = catalog_channel
+
+    def bind(self, db) -> 'Repository':
+        return Repository(
+            db,
+            product_cache=self.product_cache,
+            catalog=self.catalog,
+            catalog_channel=self.catalog_channel,
+            replicas=self.replicas,
+            idempotency_cache=self.idempotency_cache
+        )
+
+    async def _publish_catalog(self, session, deltas: List[Dict[str, Any]]) -> None:
+        if self.catalog_channel is not None:
+            await publish_catalog_changes(session, self.catalog_channel, deltas)
+
+    def _decode_product_cursor(self, cursor: str) -> tuple:
+        price, product_id = decode_cursor(cursor, 2)
+        try:
+            return Decimal(price), UUID(product_id)
+        except InvalidOperation:
+            raise ValueError("Invalid cursor")
+
+    def _invalidate_products(self, session, product_ids) -> None:
+        if self.product_cache is None:
+            return
+        product_ids = list(product_ids)
+        for product_id in product_ids:
+            self.product_cache.invalidate(product_id)
+
+        # a reader can cache the old row again until this transaction commits
+        def invalidate_committed(_):
+            for product_id in product_ids:
+                self.product_cache.invalidate(product_id)
+        event.listen(session.sync_session, 'after_commit', invalidate_committed, once=True)
     
-    async def get_products(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    async def get_products(self, skip: int = 0, limit: int = 100,
+                           cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        after = self._decode_product_cursor(cursor) if cursor else None
+        if self.catalog is not None and self.catalog.ready:
+            return self.catalog.page(skip=skip, limit=limit, after=after)
+
         async with self.db.begin() as session:
-            query = select(Product).order_by(desc(Product.price)).offset(skip).limit(limit)
+            query = (
+                select(*PRODUCT_COLUMNS)
+                .order_by(desc(Product.price), desc(Product.id))
+                .limit(limit)
+            )
+            if after:
+                query = query.where(tuple_(Product.price, Product.id) < tuple_(*after))
+            elif skip:
+                query = query.offset(skip)
             result = await session.execute(query)
-            products = result.scalars().all()
             return [{
                 'id': product.id,
                 'name': product.name,
                 'price': float(product.price),
                 'quantity': float(product.quantity),
                 'created_at': product.created_at
-            } for product in products]
+            } for product in result.all()]
     
-    async def get_product(self, product_id):
+    async def get_catalog_version(self) -> str:
+        if self.catalog is not None and self.catalog.ready:
+            return self.catalog.version()
+
         async with self.db.begin() as session:
+            count, version_sum = (await session.execute(
+                select(func.count(), func.coalesce(func.sum(Product.version), 0))
+            )).one()
+            return f"{count}.{int(version_sum)}"
+
+    @replica_read
+    async def get_product(self, product_id):
+        if self.catalog is not None and self.catalog.ready:
+            return self.catalog.get(product_id)
+
+        if self.product_cache is not None:
+            cached = self.product_cache.get(product_id)
+            if cached is not None:
+                return cached
+
+        async with read_session(self.db, self.replicas) as session:
             try:
                 query = (
-                    select(Product)
+                    select(*PRODUCT_COLUMNS, Product.version)
                     .where(Product.id == product_id)
                 )
                 result = await session.execute(query)
-                return result.scalar()
+                product = result.first()
+                if product is None:
+                    return None
+
+                product_dict = {
+                    'id': product.id,
+                    'name': product.name,
+                    'price': float(product.price),
+                    'quantity': float(product.quantity),
+                    'created_at': product.created_at,
+                    'version': product.version
+                }
+                # a lagging replica could put back a row that a write just invalidated
+                if self.product_cache is not None and not session.info.get('replica'):
+                    self.product_cache.set(product.id, product_dict)
+                return product_dict
             except Exception as e:
                 await session.rollback()
-                raise ValueError(f"Failed to create product: {str(e)}")
-                
+                raise ValueError(f"Failed to fetch product: {str(e)}")
+
+    @replica_read
+    async def search_products(self, query: str, limit: int = 20,
+                              prefix: bool = False) -> List[Dict[str, Any]]:
+        term = query.strip().lower()
+        if not term:
+            return []
+        name = func.lower(Product.name)
+
+        async with read_session(self.db, self.replicas) as session:
+            try:
+                # trigrams need at least three characters to narrow anything down
+                if prefix or len(term) < 3:
+                    # byte-order range on the text_pattern_ops index; unlike LIKE 'term%'
+                    # it still uses the index in a generic prepared-statement plan
+                    upper = term[:-1] + chr(ord(term[-1]) + 1)
+                    stmt = (
+                        select(*PRODUCT_COLUMNS)
+                        .where(name.op('~>=~')(term), name.op('~<~')(upper))
+                        .order_by(name, Product.id)
+                        .limit(limit)
+                    )
+                else:
+                    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                    # nearest-neighbour scan on the GiST trigram index: rows come out
+                    # of the index already in distance order, so a common term stops
+                    # after `limit` matches instead of collecting and sorting them all
+                    stmt = (
+                        select(*PRODUCT_COLUMNS)
+                        .where(name.like(f'%{escaped}%'))
+                        .order_by(name.op('<->', return_type=Float)(term))
+                        .limit(limit)
+                    )
+                result = await session.execute(stmt)
+                return [{
+                    'id': product.id,
+                    'name': product.name,
+                    'price': float(product.price),
+                    'quantity': float(product.quantity),
+                    'created_at': product.created_at
+                } for product in result.all()]
+            except Exception as e:
+                await session.rollback()
+                raise ValueError(f"Failed to search products: {str(e)}")
+
+    @replica_read
+    async def get_products_by_ids(self, product_ids: List[UUID]) -> List[Dict[str, Any]]:
+        product_ids = list(dict.fromkeys(product_ids))
+        if self.catalog is not None and self.catalog.ready:
+            products = (self.catalog.get(product_id) for product_id in product_ids)
+            return [product for product in products if product is not None]
+
+        found = {}
+        if self.product_cache is not None:
+            for product_id in product_ids:
+                cached = self.product_cache.get(product_id)
+                if cached is not None:
+                    found[product_id] = cached
+        uncached_ids = [product_id for product_id in product_ids if product_id not in found]
+
+        if uncached_ids:
+            async with read_session(self.db, self.replicas) as session:
+                try:
+                    # a single array parameter, so every batch size shares one prepared statement
+                    query = select(*PRODUCT_COLUMNS, Product.version).where(Product.id == any_(
+                        bindparam('product_ids', uncached_ids, type_=ARRAY(UUID_TYPE(as_uuid=True)))
+                    ))
+                    result = await session.execute(query)
+                    for product in result.all():
+                        product_dict = {
+                            'id': product.id,
+                            'name': product.name,
+                            'price': float(product.price),
+                            'quantity': float(product.quantity),
+                            'created_at': product.created_at,
+                            'version': product.version
+                        }
+                        if self.product_cache is not None and not session.info.get('replica'):
+                            self.product_cache.set(product.id, product_dict)
+                        found[product.id] = product_dict
+                except Exception as e:
+                    await session.rollback()
+                    raise ValueError(f"Failed to fetch products: {str(e)}")
+
+        return [found[product_id] for product_id in product_ids if product_id in found]
     
     async def create_product(self, product_data):
         async with self.db.begin() as session:  
@@ -55,6 +264,8 @@ class Repository(AbstractRepository):
                 
                 result = await session.execute(stmt)
                 created_product = result.scalar_one()
+                self._invalidate_products(session, [created_product.id])
+                await self._publish_catalog(session, [product_delta(created_product)])
                 
                 return {
                     'id': created_product.id,
@@ -79,13 +290,15 @@ class Repository(AbstractRepository):
                 stmt = (
                     update(Product)
                     .where(Product.id == product_id)
-                    .values(**update_data)
+                    .values(**update_data, version=func.nextval(CATALOG_VERSION_SEQUENCE))
                     .returning(Product)
                 )
                 
 
                 result = await session.execute(stmt)
                 updated_product = result.scalar_one()
+                self._invalidate_products(session, [product_id])
+                await self._publish_catalog(session, [product_delta(updated_product)])
                 
 
                 return {
@@ -108,13 +321,15 @@ class Repository(AbstractRepository):
                 stmt = (
                     update(Product)
                     .where(Product.id == product_id)
-                    .values(**product_data)
+                    .values(**product_data, version=func.nextval(CATALOG_VERSION_SEQUENCE))
                     .returning(Product)
                 )
                 
     
                 result = await session.execute(stmt)
                 updated_product = result.scalar_one()
+                self._invalidate_products(session, [product_id])
+                await self._publish_catalog(session, [product_delta(updated_product)])
                 
 
                 return {
@@ -135,15 +350,18 @@ class Repository(AbstractRepository):
                 stmt = (
                     delete(Product)
                     .where(Product.id == product_id)
-                    .returning(Product.id)
+                    .returning(Product.id, func.nextval(CATALOG_VERSION_SEQUENCE))
                 )
                 
 
                 result = await session.execute(stmt)
-                deleted_product_id = result.scalar_one_or_none()
+                deleted_product = result.one_or_none()
+                self._invalidate_products(session, [product_id])
                 
-                if not deleted_product_id:
+                if not deleted_product:
                     return False
+
+                await self._publish_catalog(session, [deleted_delta(*deleted_product)])
     
                 return True
                 
@@ -151,94 +369,492 @@ class Repository(AbstractRepository):
                 await session.rollback()
                 raise ValueError(f"Failed to delete product: {str(e)}")
     
-    async def create_transaction_with_items(self, transaction_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def import_products(self, batches: AsyncIterator[List[Dict[str, Any]]]) -> int:
         async with self.db.begin() as session:
             try:
-                required_fields = ['cashier_id', 'total_price', 'items']
-                for field in required_fields:
-                    if field not in transaction_data:
-                        raise ValueError(f"Missing required field: {field}")
-
-                product_ids = [item['product_id'] for item in transaction_data['items']]
-                products = await session.execute(
-                    select(Product).where(Product.id.in_(product_ids))
-                )
-                products = products.scalars().all()
-                product_map = {p.id: p for p in products}
-
-                for item in transaction_data['items']:
-                    if item['product_id'] not in product_map:
-                        raise ValueError(f"Product {item['product_id']} not found")
-
-                transaction_values = {
-                    'id': transaction_data.get('id', uuid.uuid4()),
-                    'cashier_id': transaction_data['cashier_id'],
-                    'total_price': transaction_data['total_price'],
-                    'status': transaction_data.get('status', 'paid'),
-                    'created_at': transaction_data.get('created_at', datetime.utcnow()),
-                    'updated_at': transaction_data.get('updated_at', datetime.utcnow())
+                connection = await session.connection()
+                raw_connection = await connection.get_raw_connection()
+                driver_connection = raw_connection.driver_connection
+
+                imported = 0
+                async for batch in batches:
+                    if not batch:
+                        continue
+                    created_at = datetime.utcnow()
+                    records = [(
+                        uuid.uuid4(),
+                        row['name'],
+                        Decimal(row['price']),
+                        Decimal(row.get('quantity', 0)),
+                        created_at
+                    ) for row in batch]
+                    await driver_connection.copy_records_to_table(
+                        Product.__tablename__,
+                        records=records,
+                        columns=['id', 'name', 'price', 'quantity', 'created_at']
+                    )
+                    imported += len(records)
+
+                if imported:
+                    await self._publish_catalog(session, [reload_delta()])
+                return imported
+
+            except Exception as e:
+                await session.rollback()
+                raise ValueError(f"Failed to import products: {str(e)}")
+    
+    async def _decrement_stock(self, session, quantities: Dict[UUID, Any],
+                               check_stock: bool = True) -> List[Any]:
+        requested = values(
+            column('product_id', UUID_TYPE(as_uuid=True)),
+            column('quantity', Numeric(10, 2)),
+            name='requested'
+        ).data(sorted(quantities.items()))
+
+        reserved = update(Product).where(Product.id == requested.c.product_id)
+        if check_stock:
+            reserved = reserved.where(Product.quantity >= requested.c.quantity)
+        reserved = (
+            reserved
+            .values(
+                quantity=Product.quantity - requested.c.quantity,
+                version=func.nextval(CATALOG_VERSION_SEQUENCE)
+            )
+            .returning(
+                Product.id,
+                Product.name,
+                Product.price,
+                Product.quantity,
+                Product.created_at,
+                Product.version,
+                requested.c.quantity.label('requested')
+            )
+            .cte('reserved')
+        )
+
+        stmt = select(
+            reserved.c.id,
+            reserved.c.name,
+            reserved.c.price,
+            reserved.c.quantity,
+            reserved.c.created_at,
+            reserved.c.version,
+            reserved.c.requested,
+            func.sum(reserved.c.price * reserved.c.requested).over().label('total_price')
+        )
+        result = await session.execute(stmt)
+        rows = result.all()
+        self._invalidate_products(session, quantities.keys())
+        deltas = [product_delta(row) for row in rows]
+        if self.catalog_channel is not None and self.catalog.publishing:
+            def queue_committed(_):
+                self.catalog.queue(deltas)
+            event.listen(session.sync_session, 'after_commit', queue_committed, once=True)
+        else:
+            await self._publish_catalog(session, deltas)
+        return rows
+
+    async def _apply_sales_rollup(self, session, rows, tickets: Dict[date, int], sign: int = 1) -> None:
+        totals = {}
+        for day, product_id, units, revenue in rows:
+            key = (day, product_id)
+            current = totals.get(key, (0, 0, 0))
+            totals[key] = (
+                current[0] + sign * units,
+                current[1] + sign * revenue,
+                current[2] + sign
+            )
+        if not totals and not tickets:
+            return
+
+        # a random shard per statement keeps concurrent checkouts off one row per day
+        shard = random.randrange(DAILY_SALES_SHARDS)
+        stmt = pg_insert(DailySales).values([
+            {'day': day, 'shard': shard, 'tickets': sign * count}
+            for day, count in sorted(tickets.items())
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailySales.day, DailySales.shard],
+            set_={'tickets': DailySales.tickets + stmt.excluded.tickets}
+        )
+        if totals:
+            # rows in key order, so concurrent upserts lock them in the same order
+            product_rollup = pg_insert(DailyProductSales).values([{
+                'day': day,
+                'product_id': product_id,
+                'units': units,
+                'revenue': revenue,
+                'tickets': product_tickets
+            } for (day, product_id), (units, revenue, product_tickets) in sorted(totals.items())])
+            product_rollup = product_rollup.on_conflict_do_update(
+                index_elements=[DailyProductSales.day, DailyProductSales.product_id],
+                set_={
+                    'units': DailyProductSales.units + product_rollup.excluded.units,
+                    'revenue': DailyProductSales.revenue + product_rollup.excluded.revenue,
+                    'tickets': DailyProductSales.tickets + product_rollup.excluded.tickets
                 }
+            ).returning(DailyProductSales.day).cte('product_rollup')
+            stmt = stmt.add_cte(product_rollup)
+        await session.execute(stmt)
+
+    async def _transaction_sales_rows(self, session, transaction_id: UUID, day) -> List[Any]:
+        result = await session.execute(
+            select(
+                transaction_product.c.product_id,
+                transaction_product.c.quantity,
+                func.coalesce(transaction_product.c.price, Product.price)
+            )
+            .join(Product, Product.id == transaction_product.c.product_id)
+            .where(transaction_product.c.transaction_id == transaction_id)
+        )
+        return [
+            (day, product_id, quantity, quantity * price)
+            for product_id, quantity, price in result.all()
+        ]
+
+    async def _insert_transaction(self, session, transaction_data: Dict[str, Any]) -> Dict[str, Any]:
+        required_fields = ['cashier_id', 'items']
+        for field in required_fields:
+            if field not in transaction_data:
+                raise ValueError(f"Missing required field: {field}")
+        if not transaction_data['items']:
+            raise ValueError("Transaction has no items")
+
+        quantities = {}
+        for item in transaction_data['items']:
+            if item['quantity'] <= 0:
+                raise ValueError(f"Quantity for product {item['product_id']} must be positive")
+            quantities[item['product_id']] = quantities.get(item['product_id'], 0) + item['quantity']
+
+        reserved = await self._decrement_stock(session, quantities)
+        if len(reserved) != len(quantities):
+            reserved_ids = {row.id for row in reserved}
+            unreserved = [product_id for product_id in quantities if product_id not in reserved_ids]
+            existing = await session.execute(
+                select(Product.id).where(Product.id.in_(unreserved))
+            )
+            existing_ids = set(existing.scalars().all())
+            for product_id in unreserved:
+                if product_id not in existing_ids:
+                    raise ValueError(f"Product {product_id} not found")
+            raise ValueError(f"Insufficient stock for product {unreserved[0]}")
+
+        product_map = {row.id: row for row in reserved}
+
+        transaction_values = {
+            'id': transaction_data.get('id', uuid.uuid4()),
+            'cashier_id': transaction_data['cashier_id'],
+            'total_price': reserved[0].total_price,
+            'status': transaction_data.get('status', 'paid'),
+            'created_at': transaction_data.get('created_at', datetime.utcnow()),
+            'updated_at': transaction_data.get('updated_at', datetime.utcnow())
+        }
                 
-                stmt = insert(Transaction).values(**transaction_values).returning(Transaction)
-                result = await session.execute(stmt)
-                new_transaction = result.scalar_one()
+        stmt = insert(Transaction).values(**transaction_values).returning(Transaction)
+        result = await session.execute(stmt)
+        new_transaction = result.scalar_one()
+                
+        items_values = [{
+            'transaction_id': new_transaction.id,
+            'product_id': product_id,
+            'quantity': quantity,
+            'price': product_map[product_id].price
+        } for product_id, quantity in quantities.items()]
                 
-                if transaction_data['items']:
-                    items_values = [{
-                        'transaction_id': new_transaction.id,
-                        'product_id': item['product_id'],
-                        'quantity': item['quantity']
-                    } for item in transaction_data['items']]
-                    
+        await session.execute(
+            insert(transaction_product).values(items_values)
+        )
+
+        if new_transaction.status == 'paid':
+            await self._apply_sales_rollup(session, [
+                (
+                    new_transaction.created_at.date(),
+                    product_id,
+                    quantity,
+                    quantity * product_map[product_id].price
+                ) for product_id, quantity in quantities.items()
+            ], {new_transaction.created_at.date(): 1})
+                
+        transaction_dict = {
+            'id': new_transaction.id,
+            'cashier_id': new_transaction.cashier_id,
+            'total_price': int(new_transaction.total_price),  
+            'status': new_transaction.status,
+            'created_at': new_transaction.created_at.isoformat(),
+            'updated_at': new_transaction.updated_at.isoformat(),
+            'items': [
+                {
+                    'product_id': product_id,
+                    'name': product_map[product_id].name,
+                    'price': int(product_map[product_id].price),  
+                    'quantity': int(quantity)  
+                } for product_id, quantity in quantities.items()
+            ]
+        }
+        return transaction_dict
+
+    async def create_transaction_with_items(self, transaction_data: Dict[str, Any]) -> Dict[str, Any]:
+        async with self.db.begin() as session:
+            try:
+                return await self._insert_transaction(session, transaction_data)
+            except Exception as e:
+                await session.rollback()
+                raise ValueError(f"Failed to create transaction: {str(e)}")
+
+    def _replay(self, idempotency_key: str, request_hash: str,
+                stored_hash: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        if stored_hash != request_hash:
+            raise IdempotencyKeyMismatch(
+                f"Idempotency key {idempotency_key} was already used with a different request"
+            )
+        return response
+
+    async def create_transaction_idempotent(self, transaction_data: Dict[str, Any],
+                                            idempotency_key: str,
+                                            request_hash: str) -> Tuple[Dict[str, Any], bool]:
+        """Create a transaction once per idempotency key.
+
+        Returns the response and whether it is a replay. The key is claimed in
+        the same database transaction as the sale, so a concurrent retry waits
+        on the key's unique index until the first attempt commits (and then
+        replays it) or rolls back (and then makes the sale itself).
+        """
+        if self.idempotency_cache is not None:
+            cached = self.idempotency_cache.get(idempotency_key)
+            if cached is not None:
+                return self._replay(idempotency_key, request_hash, *cached), True
+
+        now = datetime.utcnow()
+        async with self.db.begin() as session:
+            try:
+                # a key past its TTL that cleanup has not reached yet is taken over
+                claim = pg_insert(IdempotencyKey).values(
+                    key=idempotency_key,
+                    request_hash=request_hash,
+                    created_at=now
+                )
+                claim = claim.on_conflict_do_update(
+                    index_elements=[IdempotencyKey.key],
+                    set_={
+                        'request_hash': claim.excluded.request_hash,
+                        'response': null(),
+                        'created_at': claim.excluded.created_at
+                    },
+                    where=IdempotencyKey.created_at < now - timedelta(seconds=IDEMPOTENCY_KEY_TTL)
+                ).returning(IdempotencyKey.key)
+                claimed = (await session.execute(claim)).scalar_one_or_none()
+
+                if claimed is None:
+                    stored = (await session.execute(
+                        select(IdempotencyKey.request_hash, IdempotencyKey.response)
+                        .where(IdempotencyKey.key == idempotency_key)
+                    )).one()
+                    replayed = True
+                else:
+                    transaction_dict = await self._insert_transaction(session, transaction_data)
+                    stored = (request_hash, json.loads(json.dumps(transaction_dict, default=str)))
                     await session.execute(
-                        insert(transaction_product).values(items_values)
+                        update(IdempotencyKey)
+                        .where(IdempotencyKey.key == idempotency_key)
+                        .values(response=stored[1])
                     )
-                
-                transaction_dict = {
-                    'id': new_transaction.id,
-                    'cashier_id': new_transaction.cashier_id,
-                    'total_price': int(new_transaction.total_price),  
-                    'status': new_transaction.status,
-                    'created_at': new_transaction.created_at.isoformat(),
-                    'updated_at': new_transaction.updated_at.isoformat(),
-                    'items': [
-                        {
-                            'product_id': item['product_id'],
-                            'name': product_map[item['product_id']].name,
-                            'price': int(product_map[item['product_id']].price),  
-                            'quantity': int(item['quantity'])  
-                        } for item in transaction_data['items']
-                    ]
-                }
-                return transaction_dict
+                    replayed = False
+                    if self.idempotency_cache is not None:
+                        # only a committed sale may be replayed from memory
+                        def cache_committed(_):
+                            self.idempotency_cache.set(idempotency_key, stored)
+                        event.listen(session.sync_session, 'after_commit', cache_committed, once=True)
             except Exception as e:
                 await session.rollback()
                 raise ValueError(f"Failed to create transaction: {str(e)}")
 
+        if replayed and self.idempotency_cache is not None:
+            self.idempotency_cache.set(idempotency_key, tuple(stored))
+        return self._replay(idempotency_key, request_hash, *stored), replayed
+
+    async def purge_idempotency_keys(self, older_than: datetime, batch_size: int = 5000) -> int:
+        deleted = 0
+        while True:
+            async with self.db.begin() as session:
+                try:
+                    # short batches, skipping keys a running request holds
+                    expired = (
+                        select(IdempotencyKey.key)
+                        .where(IdempotencyKey.created_at < older_than)
+                        .limit(batch_size)
+                        .with_for_update(skip_locked=True)
+                    )
+                    result = await session.execute(
+                        delete(IdempotencyKey).where(IdempotencyKey.key.in_(expired))
+                    )
+                    deleted += result.rowcount
+                except Exception as e:
+                    await session.rollback()
+                    raise ValueError(f"Failed to purge idempotency keys: {str(e)}")
+            if result.rowcount < batch_size:
+                return deleted
+
+    async def create_transactions_batch(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        async with self.db.begin() as session:
+            try:
+                product_ids = {
+                    item['product_id']
+                    for transaction_data in transactions
+                    for item in transaction_data['items']
+                }
+                product_map = {}
+                if self.catalog is not None and self.catalog.ready:
+                    for product_id in product_ids:
+                        product = self.catalog.get_price(product_id)
+                        if product is not None:
+                            product_map[product_id] = ProductPrice(
+                                product['id'], product['name'], product['_price']
+                            )
+                elif self.product_cache is not None:
+                    for product_id in product_ids:
+                        cached = self.product_cache.get(product_id)
+                        if cached is not None:
+                            product_map[product_id] = ProductPrice(
+                                cached['id'], cached['name'], Decimal(str(cached['price']))
+                            )
+                uncached_ids = product_ids - product_map.keys()
+                if uncached_ids:
+                    products = await session.execute(
+                        select(Product.id, Product.name, Product.price)
+                        .where(Product.id.in_(uncached_ids))
+                    )
+                    product_map.update(
+                        (product.id, ProductPrice(product.id, product.name, product.price))
+                        for product in products.all()
+                    )
+
+                cashier_ids = {transaction_data['cashier_id'] for transaction_data in transactions}
+                cashiers = await session.execute(select(User.id).where(User.id.in_(cashier_ids)))
+                known_cashiers = set(cashiers.scalars().all())
+
+                results = []
+                transactions_values = []
+                items_values = []
+                sold_quantities = {}
+                sales_rows = []
+                day_tickets = {}
+                for index, transaction_data in enumerate(transactions):
+                    if transaction_data['cashier_id'] not in known_cashiers:
+                        results.append({
+                            'index': index,
+                            'status': 'rejected',
+                            'detail': f"Cashier {transaction_data['cashier_id']} not found"
+                        })
+                        continue
+                    if not transaction_data['items']:
+                        results.append({
+                            'index': index,
+                            'status': 'rejected',
+                            'detail': "Transaction has no items"
+                        })
+                        continue
+                    invalid = [
+                        str(item['product_id']) for item in transaction_data['items']
+                        if item['quantity'] <= 0
+                    ]
+                    if invalid:
+                        results.append({
+                            'index': index,
+                            'status': 'rejected',
+                            'detail': f"Quantity must be positive for products: {', '.join(invalid)}"
+                        })
+                        continue
+                    # repeated lines for one product are merged, as on the online path
+                    quantities = {}
+                    for item in transaction_data['items']:
+                        quantities[item['product_id']] = quantities.get(item['product_id'], 0) + item['quantity']
+                    missing = [str(product_id) for product_id in quantities if product_id not in product_map]
+                    if missing:
+                        results.append({
+                            'index': index,
+                            'status': 'rejected',
+                            'detail': f"Products not found: {', '.join(missing)}"
+                        })
+                        continue
+
+                    transaction_values = {
+                        'id': transaction_data.get('id') or uuid.uuid4(),
+                        'cashier_id': transaction_data['cashier_id'],
+                        'total_price': sum(
+                            product_map[product_id].price * quantity
+                            for product_id, quantity in quantities.items()
+                        ),
+                        'status': transaction_data.get('status', 'paid'),
+                        'created_at': transaction_data.get('created_at') or datetime.utcnow(),
+                        'updated_at': transaction_data.get('updated_at') or datetime.utcnow()
+                    }
+                    transactions_values.append(transaction_values)
+                    items_values.extend({
+                        'transaction_id': transaction_values['id'],
+                        'product_id': product_id,
+                        'quantity': quantity,
+                        'price': product_map[product_id].price
+                    } for product_id, quantity in quantities.items())
+
+                    if transaction_values['status'] == 'paid':
+                        sale_day = transaction_values['created_at'].date()
+                        day_tickets[sale_day] = day_tickets.get(sale_day, 0) + 1
+                        for product_id, quantity in quantities.items():
+                            sold_quantities[product_id] = sold_quantities.get(product_id, 0) + quantity
+                            sales_rows.append((
+                                sale_day,
+                                product_id,
+                                quantity,
+                                quantity * product_map[product_id].price
+                            ))
+
+                    results.append({
+                        'index': index,
+                        'status': 'created',
+                        'transaction': {
+                            'id': transaction_values['id'],
+                            'cashier_id': transaction_values['cashier_id'],
+                            'total_price': int(transaction_values['total_price']),
+                            'status': transaction_values['status'],
+                            'created_at': transaction_values['created_at'].isoformat(),
+                            'updated_at': transaction_values['updated_at'].isoformat(),
+                            'items': [
+                                {
+                                    'product_id': product_id,
+                                    'name': product_map[product_id].name,
+                                    'price': int(product_map[product_id].price),
+                                    'quantity': int(quantity)
+                                } for product_id, quantity in quantities.items()
+                            ]
+                        }
+                    })
+
+                if transactions_values:
+                    await session.execute(insert(Transaction), transactions_values)
+                if items_values:
+                    await session.execute(insert(transaction_product), items_values)
+                if sold_quantities:
+                    await self._decrement_stock(session, sold_quantities, check_stock=False)
+                await self._apply_sales_rollup(session, sales_rows, day_tickets)
+
+                return results
+            except Exception as e:
+                await session.rollback()
+                raise ValueError(f"Failed to create transactions: {str(e)}")
+
+    @replica_read
     async def get_transactions_with_items(
         self,
         skip: int = 0,
         limit: int = 100,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        cursor: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        async with self.db.begin() as session:
+        async with read_session(self.db, self.replicas) as session:
             stmt = (
-                select(
-                    Transaction,
-                    Product,
-                    transaction_product.c.quantity
-                )
-                .join(
-                    transaction_product,
-                    Transaction.id == transaction_product.c.transaction_id
-                )
-                .join(
-                    Product,
-                    Product.id == transaction_product.c.product_id
-                )
-                .order_by(Transaction.created_at.desc())
-                .offset(skip)
+                select(*TRANSACTION_COLUMNS)
+                .order_by(Transaction.created_at.desc(), Transaction.id.desc())
                 .limit(limit)
             )
 
@@ -246,39 +862,266 @@ class Repository(AbstractRepository):
                 stmt = stmt.where(Transaction.created_at >= start_date)
             if end_date:
                 stmt = stmt.where(Transaction.created_at <= end_date)
+            if cursor:
+                created_at, transaction_id = decode_cursor(cursor, 2)
+                stmt = stmt.where(
+                    tuple_(Transaction.created_at, Transaction.id)
+                    < tuple_(datetime.fromisoformat(created_at), UUID(transaction_id))
+                )
+            elif skip:
+                stmt = stmt.offset(skip)
 
             result = await session.execute(stmt)
-            records = result.all()
+            transactions = result.all()
+            if not transactions:
+                return []
 
-            transactions_map = {}
-            for transaction, product, quantity in records:
-                if transaction.id not in transactions_map:
-                    transactions_map[transaction.id] = {
-                        "id": transaction.id,
-                        "cashier_id": transaction.cashier_id,
-                        "total_price": int(transaction.total_price),  
-                        "status": transaction.status,
-                        "created_at": transaction.created_at.isoformat(),
-                        "updated_at": transaction.updated_at.isoformat(),
-                        "items": []
-                    }
-                transactions_map[transaction.id]["items"].append({
-                    "product_id": product.id,
-                    "name": product.name,
-                    "price": int(product.price),  
-                    "quantity": int(quantity)  
+            transactions_map = {
+                transaction.id: {
+                    "id": transaction.id,
+                    "cashier_id": transaction.cashier_id,
+                    "total_price": int(transaction.total_price),
+                    "status": transaction.status,
+                    "created_at": transaction.created_at.isoformat(),
+                    "updated_at": transaction.updated_at.isoformat(),
+                    "items": []
+                } for transaction in transactions
+            }
+
+            items_stmt = (
+                select(transaction_product.c.transaction_id, *ITEM_COLUMNS)
+                .join(
+                    Product,
+                    Product.id == transaction_product.c.product_id
+                )
+                .where(transaction_product.c.transaction_id.in_(transactions_map.keys()))
+            )
+            result = await session.execute(items_stmt)
+            for item in result.all():
+                transactions_map[item.transaction_id]["items"].append({
+                    "product_id": item.product_id,
+                    "name": item.name,
+                    "price": int(item.price),
+                    "quantity": int(item.quantity)
                 })
 
             return list(transactions_map.values())
     
-    async def get_transaction_with_items(self, transaction_id: UUID):
-        async with self.db.begin() as session:
+    @replica_read
+    async def stream_transactions_with_items(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        stmt = (
+            select(
+                Transaction.id,
+                Transaction.cashier_id,
+                Transaction.total_price,
+                Transaction.status,
+                Transaction.created_at,
+                Transaction.updated_at,
+                transaction_product.c.product_id,
+                Product.name,
+                Product.price,
+                transaction_product.c.quantity
+            )
+            .outerjoin(
+                transaction_product,
+                Transaction.id == transaction_product.c.transaction_id
+            )
+            .outerjoin(
+                Product,
+                Product.id == transaction_product.c.product_id
+            )
+            .order_by(Transaction.created_at, Transaction.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        if start_date:
+            stmt = stmt.where(Transaction.created_at >= start_date)
+        if end_date:
+            stmt = stmt.where(Transaction.created_at <= end_date)
+
+        async with read_session(self.db, self.replicas) as session:
+            result = await session.stream(stmt)
+            current = None
+            async for row in result:
+                if current is None or current["id"] != row.id:
+                    if current is not None:
+                        yield current
+                    current = {
+                        "id": row.id,
+                        "cashier_id": row.cashier_id,
+                        "total_price": int(row.total_price),
+                        "status": row.status,
+                        "created_at": row.created_at.isoformat(),
+                        "updated_at": row.updated_at.isoformat(),
+                        "items": []
+                    }
+                if row.product_id is not None:
+                    current["items"].append({
+                        "product_id": row.product_id,
+                        "name": row.name,
+                        "price": int(row.price),
+                        "quantity": int(row.quantity)
+                    })
+            if current is not None:
+                yield current
+    
+    @replica_read
+    async def get_sales_report(
+        self,
+        group_by: str = 'day',
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        status: str = 'paid'
+    ) -> List[Dict[str, Any]]:
+        if group_by not in ('day', 'week', 'product', 'cashier'):
+            raise ValueError(f"Invalid group_by: {group_by}")
+
+        if status == 'paid' and group_by != 'cashier':
+            return await self._get_rollup_sales_report(group_by, start_date, end_date)
+
+        filters = [Transaction.status == status]
+        if start_date:
+            filters.append(Transaction.created_at >= start_date)
+        if end_date:
+            filters.append(Transaction.created_at <= end_date)
+
+        if group_by == 'product':
             stmt = (
                 select(
-                    Transaction,
-                    Product,
-                    transaction_product.c.quantity
+                    Product.id.label('key'),
+                    Product.name.label('label'),
+                    func.sum(
+                        transaction_product.c.quantity
+                        * func.coalesce(transaction_product.c.price, Product.price)
+                    ).label('revenue'),
+                    func.sum(transaction_product.c.quantity).label('units'),
+                    func.count().label('tickets')
+                )
+                .select_from(Transaction)
+                .join(transaction_product, transaction_product.c.transaction_id == Transaction.id)
+                .join(Product, Product.id == transaction_product.c.product_id)
+                .where(*filters)
+                .group_by(Product.id)
+                .order_by(desc('revenue'))
+            )
+        else:
+            tickets = (
+                select(
+                    Transaction.id,
+                    Transaction.cashier_id,
+                    Transaction.created_at,
+                    Transaction.total_price,
+                    func.coalesce(func.sum(transaction_product.c.quantity), 0).label('units')
+                )
+                .outerjoin(transaction_product, transaction_product.c.transaction_id == Transaction.id)
+                .where(*filters)
+                .group_by(Transaction.id)
+                .subquery()
+            )
+            if group_by == 'cashier':
+                key = tickets.c.cashier_id
+                stmt = (
+                    select(key.label('key'), User.username.label('label'))
+                    .select_from(tickets)
+                    .join(User, User.id == tickets.c.cashier_id)
+                    .group_by(key, User.username)
+                    .order_by(desc('revenue'))
+                )
+            else:
+                key = func.date_trunc(group_by, tickets.c.created_at)
+                stmt = (
+                    select(key.label('key'), null().label('label'))
+                    .select_from(tickets)
+                    .group_by(key)
+                    .order_by(key)
+                )
+            stmt = stmt.add_columns(
+                func.sum(tickets.c.total_price).label('revenue'),
+                func.sum(tickets.c.units).label('units'),
+                func.count().label('tickets')
+            )
+
+        async with read_session(self.db, self.replicas) as session:
+            result = await session.execute(stmt)
+            return [self._report_row(row.key, row.label, row.revenue, row.units, row.tickets)
+                    for row in result.all()]
+
+    async def _get_rollup_sales_report(
+        self,
+        group_by: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        filters = []
+        ticket_filters = []
+        if start_date:
+            filters.append(DailyProductSales.day >= start_date.date())
+            ticket_filters.append(DailySales.day >= start_date.date())
+        if end_date:
+            filters.append(DailyProductSales.day <= end_date.date())
+            ticket_filters.append(DailySales.day <= end_date.date())
+
+        async with read_session(self.db, self.replicas) as session:
+            if group_by == 'product':
+                result = await session.execute(
+                    select(
+                        DailyProductSales.product_id.label('key'),
+                        Product.name.label('label'),
+                        func.sum(DailyProductSales.revenue).label('revenue'),
+                        func.sum(DailyProductSales.units).label('units'),
+                        func.sum(DailyProductSales.tickets).label('tickets')
+                    )
+                    .join(Product, Product.id == DailyProductSales.product_id)
+                    .where(*filters)
+                    .group_by(DailyProductSales.product_id, Product.name)
+                    .order_by(desc('revenue'))
                 )
+                return [self._report_row(row.key, row.label, row.revenue, row.units, row.tickets)
+                        for row in result.all()]
+
+            key = func.date_trunc(group_by, cast(DailyProductSales.day, DateTime))
+            result = await session.execute(
+                select(
+                    key.label('key'),
+                    func.sum(DailyProductSales.revenue).label('revenue'),
+                    func.sum(DailyProductSales.units).label('units')
+                )
+                .where(*filters)
+                .group_by(key)
+                .order_by(key)
+            )
+            totals = result.all()
+
+            ticket_key = func.date_trunc(group_by, cast(DailySales.day, DateTime))
+            result = await session.execute(
+                select(ticket_key.label('key'), func.sum(DailySales.tickets).label('tickets'))
+                .where(*ticket_filters)
+                .group_by(ticket_key)
+            )
+            tickets = {row.key.date(): row.tickets for row in result.all()}
+
+            return [self._report_row(row.key, None, row.revenue, row.units, tickets.get(row.key.date(), 0))
+                    for row in totals]
+
+    def _report_row(self, key, label, revenue, units, tickets) -> Dict[str, Any]:
+        return {
+            'key': key.date().isoformat() if isinstance(key, datetime) else str(key),
+            'label': label,
+            'revenue': float(revenue or 0),
+            'units': float(units or 0),
+            'tickets': int(tickets or 0)
+        }
+    
+    @replica_read
+    async def get_transaction_with_items(self, transaction_id: UUID):
+        async with read_session(self.db, self.replicas) as session:
+            stmt = (
+                select(*TRANSACTION_COLUMNS, *ITEM_COLUMNS)
                 .join(
                     transaction_product,
                     Transaction.id == transaction_product.c.transaction_id
@@ -296,13 +1139,13 @@ class Repository(AbstractRepository):
             if not records:
                 return None
                 
-            transaction = records[0][0]
+            transaction = records[0]
             items = [{
-                "product_id": product.id,
-                "name": product.name,
-                "price": int(product.price),  
-                "quantity": int(quantity)     
-            } for (_, product, quantity) in records]
+                "product_id": record.product_id,
+                "name": record.name,
+                "price": int(record.price),  
+                "quantity": int(record.quantity)     
+            } for record in records]
             
             return {
                 "id": transaction.id,
@@ -314,8 +1157,120 @@ class Repository(AbstractRepository):
                 "items": items
             }
 
+    async def _update_transactions(self, session, transaction_ids: List[UUID],
+                                   update_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # one statement: lock the rows, update them, move paid/unpaid sales in
+        # the rollup and return the transactions with their items
+        previous = (
+            select(Transaction.id, Transaction.status)
+            .where(Transaction.id.in_(transaction_ids))
+            .order_by(Transaction.id)
+            .with_for_update()
+            .cte('previous')
+        )
+        updated = (
+            update(Transaction)
+            .where(Transaction.id == previous.c.id)
+            .values({'updated_at': datetime.utcnow(), **update_data})
+            .returning(*TRANSACTION_COLUMNS, previous.c.status.label('previous_status'))
+            .cte('updated')
+        )
+        items = (
+            select(
+                transaction_product.c.transaction_id,
+                *ITEM_COLUMNS,
+                func.coalesce(transaction_product.c.price, Product.price).label('sale_price')
+            )
+            .join(Product, Product.id == transaction_product.c.product_id)
+            .where(transaction_product.c.transaction_id.in_(select(updated.c.id)))
+            .cte('items')
+        )
+
+        sign = case((updated.c.status == 'paid', 1), else_=-1)
+        day = cast(updated.c.created_at, Date)
+        rollup = pg_insert(DailyProductSales).from_select(
+            ['day', 'product_id', 'units', 'revenue', 'tickets'],
+            select(
+                day,
+                items.c.product_id,
+                func.sum(sign * items.c.quantity),
+                func.sum(sign * items.c.quantity * items.c.sale_price),
+                func.sum(sign)
+            )
+            .join(items, items.c.transaction_id == updated.c.id)
+            .where((updated.c.previous_status == 'paid') != (updated.c.status == 'paid'))
+            .group_by(day, items.c.product_id)
+            .order_by(day, items.c.product_id)
+        )
+        rollup = rollup.on_conflict_do_update(
+            index_elements=[DailyProductSales.day, DailyProductSales.product_id],
+            set_={
+                'units': DailyProductSales.units + rollup.excluded.units,
+                'revenue': DailyProductSales.revenue + rollup.excluded.revenue,
+                'tickets': DailyProductSales.tickets + rollup.excluded.tickets
+            }
+        ).returning(DailyProductSales.day).cte('rollup')
+        daily = pg_insert(DailySales).from_select(
+            ['day', 'shard', 'tickets'],
+            select(day, literal(random.randrange(DAILY_SALES_SHARDS), SmallInteger), func.sum(sign))
+            .where((updated.c.previous_status == 'paid') != (updated.c.status == 'paid'))
+            .group_by(day)
+            .order_by(day)
+        )
+        daily = daily.on_conflict_do_update(
+            index_elements=[DailySales.day, DailySales.shard],
+            set_={'tickets': DailySales.tickets + daily.excluded.tickets}
+        ).returning(DailySales.day).cte('daily_rollup')
+
+        item_json = func.json_build_object(
+            'product_id', items.c.product_id,
+            'name', items.c.name,
+            'price', items.c.price,
+            'quantity', items.c.quantity
+        )
+        stmt = (
+            select(
+                updated.c.id,
+                updated.c.cashier_id,
+                updated.c.total_price,
+                updated.c.status,
+                updated.c.created_at,
+                updated.c.updated_at,
+                func.coalesce(
+                    func.json_agg(item_json).filter(items.c.product_id.is_not(None)),
+                    literal_column("'[]'::json")
+                ).label('items')
+            )
+            .select_from(updated.outerjoin(items, items.c.transaction_id == updated.c.id))
+            .group_by(
+                updated.c.id, updated.c.cashier_id, updated.c.total_price,
+                updated.c.status, updated.c.created_at, updated.c.updated_at
+            )
+            .add_cte(rollup, daily)
+        )
+        result = await session.execute(stmt)
+
+        transactions = []
+        for row in result.all():
+            items_json = json.loads(row.items) if isinstance(row.items, str) else row.items
+            transactions.append({
+                "id": row.id,
+                "cashier_id": row.cashier_id,
+                "total_price": int(row.total_price),
+                "status": row.status,
+                "created_at": row.created_at.isoformat(),
+                "updated_at": row.updated_at.isoformat(),
+                "items": [{
+                    "product_id": item['product_id'],
+                    "name": item['name'],
+                    "price": int(item['price']),
+                    "quantity": int(item['quantity'])
+                } for item in items_json]
+            })
+        return transactions
+
     async def update_transaction(self, transaction_id: UUID, 
-                        update_data: Dict[str, Any]) -> Dict[str, Any]:
+                        update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         async with self.db.begin() as session:
             try:
                 if not update_data:
@@ -325,37 +1280,101 @@ class Repository(AbstractRepository):
                 for field in forbidden_fields:
                     if field in update_data:
                         raise ValueError(f"Cannot update field: {field}")
+
+                transactions = await self._update_transactions(session, [transaction_id], update_data)
+                return transactions[0] if transactions else None
                 
-                stmt = (
-                    update(Transaction)
-                    .where(Transaction.id == transaction_id)
-                    .values(**update_data)
-                    .returning(Transaction)
+            except Exception as e:
+                await session.rollback()
+                raise ValueError(f"Failed to update transaction: {str(e)}")
+
+    async def update_transactions_status(self, transaction_ids: List[UUID],
+                                         status: str) -> Dict[str, Any]:
+        async with self.db.begin() as session:
+            try:
+                transaction_ids = list(dict.fromkeys(transaction_ids))
+                if not transaction_ids:
+                    raise ValueError("No transaction ids provided")
+
+                transactions = await self._update_transactions(
+                    session, transaction_ids, {'status': status}
                 )
-                
-                result = await session.execute(stmt)
-                updated_transaction = result.scalar_one()
-                
-                items = await self.get_transaction_items(updated_transaction.id)
-                
+                found = {transaction['id'] for transaction in transactions}
                 return {
-                    "id": updated_transaction.id,
-                    "cashier_id": updated_transaction.cashier_id,
-                    "total_price": int(updated_transaction.total_price),
-                    "status": updated_transaction.status,
-                    "created_at": updated_transaction.created_at.isoformat(),
-                    "updated_at": updated_transaction.updated_at.isoformat(),
-                    "items": items
+                    'updated': transactions,
+                    'missing': [
+                        transaction_id for transaction_id in transaction_ids
+                        if transaction_id not in found
+                    ]
                 }
-                
+
             except Exception as e:
                 await session.rollback()
-                raise ValueError(f"Failed to update transaction: {str(e)}")
+                raise ValueError(f"Failed to update transactions: {str(e)}")
 
-    async def get_transaction_items(self, transaction_id: UUID) -> List[Dict[str, Any]]:
+    async def rebuild_sales_rollup(self, start_date: Optional[date] = None,
+                                   end_date: Optional[date] = None) -> int:
         async with self.db.begin() as session:
+            try:
+                day = cast(Transaction.created_at, Date)
+                clear = delete(DailyProductSales)
+                source = (
+                    select(
+                        day,
+                        transaction_product.c.product_id,
+                        func.sum(transaction_product.c.quantity),
+                        func.sum(
+                            transaction_product.c.quantity
+                            * func.coalesce(transaction_product.c.price, Product.price)
+                        ),
+                        func.count()
+                    )
+                    .select_from(Transaction)
+                    .join(transaction_product, transaction_product.c.transaction_id == Transaction.id)
+                    .join(Product, Product.id == transaction_product.c.product_id)
+                    .where(Transaction.status == 'paid')
+                    .group_by(day, transaction_product.c.product_id)
+                )
+                clear_daily = delete(DailySales)
+                daily_source = (
+                    select(day, func.count())
+                    .where(Transaction.status == 'paid')
+                    .group_by(day)
+                )
+                if start_date:
+                    since = datetime.combine(start_date, time.min)
+                    clear = clear.where(DailyProductSales.day >= start_date)
+                    clear_daily = clear_daily.where(DailySales.day >= start_date)
+                    source = source.where(Transaction.created_at >= since)
+                    daily_source = daily_source.where(Transaction.created_at >= since)
+                if end_date:
+                    until = datetime.combine(end_date + timedelta(days=1), time.min)
+                    clear = clear.where(DailyProductSales.day <= end_date)
+                    clear_daily = clear_daily.where(DailySales.day <= end_date)
+                    source = source.where(Transaction.created_at < until)
+                    daily_source = daily_source.where(Transaction.created_at < until)
+
+                await session.execute(clear)
+                await session.execute(clear_daily)
+                result = await session.execute(
+                    insert(DailyProductSales).from_select(
+                        ['day', 'product_id', 'units', 'revenue', 'tickets'],
+                        source
+                    )
+                )
+                await session.execute(
+                    insert(DailySales).from_select(['day', 'tickets'], daily_source)
+                )
+                return result.rowcount
+            except Exception as e:
+                await session.rollback()
+                raise ValueError(f"Failed to rebuild sales rollup: {str(e)}")
+
+    @replica_read
+    async def get_transaction_items(self, transaction_id: UUID) -> List[Dict[str, Any]]:
+        async with read_session(self.db, self.replicas) as session:
             stmt = (
-                select(Product, transaction_product.c.quantity)
+                select(*ITEM_COLUMNS)
                 .join(
                     transaction_product,
                     Product.id == transaction_product.c.product_id
@@ -364,15 +1383,33 @@ class Repository(AbstractRepository):
             )
             result = await session.execute(stmt)
             return [{
-                "product_id": product.id,
-                "name": product.name,
-                "price": int(product.price),
-                "quantity": int(quantity)
-            } for (product, quantity) in result.all()]
+                "product_id": item.product_id,
+                "name": item.name,
+                "price": int(item.price),
+                "quantity": int(item.quantity)
+            } for item in result.all()]
 
     async def delete_transaction(self, transaction_id: UUID) -> bool:
         async with self.db.begin() as session:
             try:
+                transaction = (await session.execute(
+                    select(Transaction.status, Transaction.created_at)
+                    .where(Transaction.id == transaction_id)
+                    .with_for_update()
+                )).one_or_none()
+                if transaction is None:
+                    return False
+
+                if transaction.status == 'paid':
+                    sales_rows = await self._transaction_sales_rows(
+                        session,
+                        transaction_id,
+                        transaction.created_at.date()
+                    )
+                    await self._apply_sales_rollup(
+                        session, sales_rows, {transaction.created_at.date(): 1}, sign=-1
+                    )
+
                 await session.execute(
                     delete(transaction_product)
                     .where(transaction_product.c.transaction_id == transaction_id)
@@ -392,4 +1429,31 @@ class Repository(AbstractRepository):
             except Exception as e:
                 await session.rollback()
                 raise ValueError(f"Failed to delete transaction: {str(e)}")
-repository = Repository(async_session)
\ No newline at end of file
+catalog = CatalogSnapshot(
+    async_session,
+    dsn=DB_URL.replace('postgresql+asyncpg://', 'postgresql://', 1),
+    channel=CATALOG_CHANNEL,
+    verify_interval=CATALOG_VERIFY_INTERVAL,
+    publish_interval=CATALOG_PUBLISH_INTERVAL
+) if CATALOG_SNAPSHOT_ENABLED else None
+
+repository = Repository(
+    async_session,
+    product_cache=TTLCache(
+        maxsize=PRODUCT_CACHE_SIZE,
+        ttl=PRODUCT_CACHE_TTL
+    ) if PRODUCT_CACHE_ENABLED else None,
+    catalog=catalog,
+    catalog_channel=CATALOG_CHANNEL if CATALOG_SNAPSHOT_ENABLED else None,
+    replicas=replicas,
+    idempotency_cache=TTLCache(
+        maxsize=IDEMPOTENCY_CACHE_SIZE,
+        ttl=min(IDEMPOTENCY_CACHE_TTL, IDEMPOTENCY_KEY_TTL)
+    )
+)
+
+idempotency_purger = IdempotencyKeyPurger(
+    repository,
+    ttl=IDEMPOTENCY_KEY_TTL,
+    interval=IDEMPOTENCY_CLEANUP_INTERVAL
+)
@@ -0,0 +1,56 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class UnitOfWork:
+    """One session and one transaction shared by every repository call in a request.
+
+    It stands in for the async_sessionmaker the repositories are built with:
+    begin() hands out the same session every time instead of opening a new
+    transaction, and the session is only checked out on first use. The owner
+    commits or rolls back once at the end.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+        self.session: Optional[AsyncSession] = None
+        self.failed = False
+
+    @property
+    def on_primary(self) -> bool:
+        return self.session is not None and self.session.in_transaction()
+
+    async def has_writes(self) -> bool:
+        if not self.on_primary:
+            return False
+        # the server only assigns a transaction id once something is written
+        return await self.session.scalar(text('SELECT txid_current_if_assigned() IS NOT NULL'))
+
+    @asynccontextmanager
+    async def begin(self) -> AsyncIterator[AsyncSession]:
+        if self.session is None:
+            self.session = self.session_factory()
+        try:
+            yield self.session
+        except BaseException:
+            self.failed = True
+            raise
+
+    async def commit(self) -> None:
+        if self.session is None:
+            return
+        if self.failed:
+            await self.session.rollback()
+        else:
+            await self.session.commit()
+
+    async def rollback(self) -> None:
+        if self.session is not None:
+            await self.session.rollback()
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
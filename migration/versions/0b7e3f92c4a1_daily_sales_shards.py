@@ -0,0 +1,37 @@
+"""daily sales shards
+
+Revision ID: 0b7e3f92c4a1
+Revises: f6a2c8d3e917
+Create Date: 2026-10-18 20:14:05.338172
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7e3f92c4a1'
+down_revision: Union[str, None] = 'f6a2c8d3e917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('daily_sales', sa.Column('shard', sa.SmallInteger(), server_default='0', nullable=False))
+    op.drop_constraint('daily_sales_pkey', 'daily_sales', type_='primary')
+    op.create_primary_key('daily_sales_pkey', 'daily_sales', ['day', 'shard'])
+
+
+def downgrade() -> None:
+    op.execute("""
+        CREATE TEMPORARY TABLE daily_sales_totals AS
+        SELECT day, sum(tickets)::integer AS tickets FROM daily_sales GROUP BY day
+    """)
+    op.execute('DELETE FROM daily_sales')
+    op.drop_constraint('daily_sales_pkey', 'daily_sales', type_='primary')
+    op.drop_column('daily_sales', 'shard')
+    op.create_primary_key('daily_sales_pkey', 'daily_sales', ['day'])
+    op.execute('INSERT INTO daily_sales (day, tickets) SELECT day, tickets FROM daily_sales_totals')
+    op.execute('DROP TABLE daily_sales_totals')
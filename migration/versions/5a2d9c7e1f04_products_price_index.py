@@ -0,0 +1,31 @@
+"""products price index
+
+Revision ID: 5a2d9c7e1f04
+Revises: 1c3ffd94537f
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a2d9c7e1f04'
+down_revision: Union[str, None] = '1c3ffd94537f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_products_price_id',
+        'products',
+        [sa.text('price DESC'), sa.text('id DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_price_id', table_name='products')
@@ -0,0 +1,50 @@
+"""hot path indexes
+
+Revision ID: 9b4e0f3a6c21
+Revises: 5a2d9c7e1f04
+Create Date: 2026-10-18 11:03:27.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e0f3a6c21'
+down_revision: Union[str, None] = '5a2d9c7e1f04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_transactions_created_at_id',
+            'transactions',
+            [sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_transactions_cashier_id',
+            'transactions',
+            ['cashier_id'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_transaction_product_product_id',
+            'transaction_product',
+            ['product_id'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_transaction_product_product_id', table_name='transaction_product', postgresql_concurrently=True)
+        op.drop_index('ix_transactions_cashier_id', table_name='transactions', postgresql_concurrently=True)
+        op.drop_index('ix_transactions_created_at_id', table_name='transactions', postgresql_concurrently=True)
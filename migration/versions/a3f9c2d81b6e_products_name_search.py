@@ -0,0 +1,44 @@
+"""products name search
+
+Revision ID: a3f9c2d81b6e
+Revises: e4a8b16f02d7
+Create Date: 2026-10-18 16:12:08.431275
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f9c2d81b6e'
+down_revision: Union[str, None] = 'e4a8b16f02d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_products_name_trgm',
+            'products',
+            [sa.text('lower(name) gin_trgm_ops')],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_products_name_prefix',
+            'products',
+            [sa.text('lower(name) text_pattern_ops')],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_products_name_prefix', table_name='products', postgresql_concurrently=True)
+        op.drop_index('ix_products_name_trgm', table_name='products', postgresql_concurrently=True)
@@ -0,0 +1,46 @@
+"""daily product sales
+
+Revision ID: c7e31d58a9b2
+Revises: 9b4e0f3a6c21
+Create Date: 2026-10-18 12:21:09.517364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e31d58a9b2'
+down_revision: Union[str, None] = '9b4e0f3a6c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('transaction_product', sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=True))
+    op.create_table('daily_product_sales',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.UUID(), nullable=False),
+    sa.Column('units', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('tickets', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('day', 'product_id')
+    )
+    op.execute("""
+        INSERT INTO daily_product_sales (day, product_id, units, revenue, tickets)
+        SELECT t.created_at::date, tp.product_id, sum(tp.quantity),
+               sum(tp.quantity * p.price), count(*)
+        FROM transactions t
+        JOIN transaction_product tp ON tp.transaction_id = t.id
+        JOIN products p ON p.id = tp.product_id
+        WHERE t.status = 'paid'
+        GROUP BY t.created_at::date, tp.product_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('daily_product_sales')
+    op.drop_column('transaction_product', 'price')
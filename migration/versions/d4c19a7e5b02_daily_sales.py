@@ -0,0 +1,37 @@
+"""daily sales
+
+Revision ID: d4c19a7e5b02
+Revises: b82d4e7f1c39
+Create Date: 2026-10-18 18:22:37.604113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4c19a7e5b02'
+down_revision: Union[str, None] = 'b82d4e7f1c39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('daily_sales',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('tickets', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.execute("""
+        INSERT INTO daily_sales (day, tickets)
+        SELECT created_at::date, count(*)
+        FROM transactions
+        WHERE status = 'paid'
+        GROUP BY created_at::date
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('daily_sales')
@@ -0,0 +1,35 @@
+"""products catalog version
+
+Revision ID: e4a8b16f02d7
+Revises: c7e31d58a9b2
+Create Date: 2026-10-18 13:40:52.106937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a8b16f02d7'
+down_revision: Union[str, None] = 'c7e31d58a9b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('catalog_version_seq')))
+    op.add_column('products', sa.Column(
+        'version',
+        sa.BigInteger(),
+        server_default=sa.text("nextval('catalog_version_seq')"),
+        nullable=False
+    ))
+    op.create_index('ix_products_version', 'products', ['version'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_version', table_name='products')
+    op.drop_column('products', 'version')
+    op.execute(sa.schema.DropSequence(sa.Sequence('catalog_version_seq')))
@@ -0,0 +1,44 @@
+"""products name trigram gist index
+
+Revision ID: f6a2c8d3e917
+Revises: d4c19a7e5b02
+Create Date: 2026-10-18 18:51:14.902736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a2c8d3e917'
+down_revision: Union[str, None] = 'd4c19a7e5b02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_products_name_trgm_gist',
+            'products',
+            [sa.text('lower(name) gist_trgm_ops')],
+            unique=False,
+            postgresql_using='gist',
+            postgresql_concurrently=True
+        )
+        op.drop_index('ix_products_name_trgm', table_name='products', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_products_name_trgm',
+            'products',
+            [sa.text('lower(name) gin_trgm_ops')],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True
+        )
+        op.drop_index('ix_products_name_trgm_gist', table_name='products', postgresql_concurrently=True)
@@ -0,0 +1,53 @@
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+import csv
+import json
+
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    buffer = b''
+    line_no = 0
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            line_no += 1
+            yield line_no, line.decode('utf-8-sig' if line_no == 1 else 'utf-8').rstrip('\r')
+    if buffer:
+        line_no += 1
+        yield line_no, buffer.decode('utf-8-sig' if line_no == 1 else 'utf-8').rstrip('\r')
+
+
+async def parse_ndjson(stream: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    async for line_no, line in iter_lines(stream):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Invalid JSON: {str(e)}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "Row must be a JSON object"
+            continue
+        yield line_no, row, None
+
+
+async def parse_csv(stream: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    header = None
+    async for line_no, line in iter_lines(stream):
+        if not line.strip():
+            continue
+        try:
+            values = next(csv.reader([line]))
+        except csv.Error as e:
+            yield line_no, None, f"Invalid CSV: {str(e)}"
+            continue
+        if header is None:
+            header = [value.strip() for value in values]
+            continue
+        if len(values) != len(header):
+            yield line_no, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield line_no, dict(zip(header, values)), None
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, HTTPException, status
+from auth.core_functions import user_dependency
+from db.db_connection import engine, replicas
+from db.auth_repository import auth_repository
+from auth.password_hasher import password_hasher
+from db.repository import repository, catalog, idempotency_purger
+from db.dependencies import UnitOfWorkRoute
+import os
+
+internal_router = APIRouter(prefix='/internal', route_class=UnitOfWorkRoute)
+
+@internal_router.get('/db/pool')
+async def get_pool_stats(user: user_dependency):
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    return {
+        'pid': os.getpid(),
+        **engine.pool.snapshot()
+    }
+
+@internal_router.get('/cache')
+async def get_cache_stats(user: user_dependency):
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    return {
+        'pid': os.getpid(),
+        'users': auth_repository.user_cache.stats(),
+        'products': repository.product_cache.stats() if repository.product_cache is not None else None,
+        'idempotency_keys': repository.idempotency_cache.stats() if repository.idempotency_cache is not None else None
+    }
+
+@internal_router.get('/password_hasher')
+async def get_password_hasher_stats(user: user_dependency):
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    return {
+        'pid': os.getpid(),
+        **password_hasher.stats()
+    }
+
+@internal_router.get('/catalog')
+async def get_catalog_stats(user: user_dependency):
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    return {
+        'pid': os.getpid(),
+        'catalog': catalog.stats() if catalog is not None else None
+    }
+
+@internal_router.get('/db/replicas')
+async def get_replica_stats(user: user_dependency):
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    return {
+        'pid': os.getpid(),
+        'replicas': replicas.stats() if replicas is not None else [],
+        'primary_fallbacks': replicas.primary_fallbacks if replicas is not None else 0
+    }
+
+@internal_router.get('/idempotency')
+async def get_idempotency_stats(user: user_dependency):
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    return {
+        'pid': os.getpid(),
+        'cleanup': idempotency_purger.stats()
+    }
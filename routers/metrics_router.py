@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from api.metrics import route_metrics, render_password_hasher
+from auth.password_hasher import password_hasher
+
+metrics_router = APIRouter()
+
+@metrics_router.get('/metrics', response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(
+        route_metrics.render() + render_password_hasher(password_hasher.stats()),
+        media_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, Field, validator
 from uuid import UUID
 from datetime import datetime
 from typing import Optional, List
@@ -15,6 +15,13 @@ class ProductResponse(BaseModel):
     quantity: int
     created_at: datetime
     
+class ProductBatchRequest(BaseModel):
+    ids: List[UUID]
+
+class ProductBatchResponse(BaseModel):
+    products: List[ProductResponse]
+    missing: List[UUID]
+
 class ProductUpdate(BaseModel):
     name: str
     price: int
@@ -22,20 +29,24 @@ class ProductUpdate(BaseModel):
 
 class TransactionItemRequest(BaseModel):
     product_id: UUID
-    quantity: int
+    quantity: int = Field(gt=0)
+
+def validate_transaction_status(v):
+    valid_status = ['paid', 'canceled']
+    if v not in valid_status:
+        raise ValueError(f"Invalid transaction status. Must be one of: {', '.join(valid_status)}")
+    return v
 
 class TransactionRequest(BaseModel):
     cashier_id: UUID
-    total_price: int
+    total_price: Optional[int] = None
     status: str = "paid" 
-    items: List[TransactionItemRequest] 
+    items: List[TransactionItemRequest] = Field(..., min_items=1)
     
-    @validator('status')
-    def validate_status(cls, v):
-        valid_status = ['paid', 'canceled']
-        if v not in valid_status:
-            raise ValueError(f"Invalid transaction status. Must be one of: {', '.join(valid_status)}")
-        return v
+    _validate_status = validator('status', allow_reuse=True)(validate_transaction_status)
+
+class OfflineTransactionRequest(TransactionRequest):
+    created_at: Optional[datetime] = None
 
 class TransactionItemResponse(BaseModel):
     product_id: UUID
@@ -52,7 +63,34 @@ class TransactionResponse(BaseModel):
     updated_at: datetime
     items: List[TransactionItemResponse]  
 
+class TransactionBatchResult(BaseModel):
+    index: int
+    status: str
+    detail: Optional[str] = None
+    transaction: Optional[TransactionResponse] = None
+
+class SalesReportRow(BaseModel):
+    key: str
+    label: Optional[str] = None
+    revenue: float
+    units: float
+    tickets: int
+
+class TransactionStatusUpdate(BaseModel):
+    transaction_ids: List[UUID]
+    status: str
+
+    _validate_status = validator('status', allow_reuse=True)(validate_transaction_status)
+
+class TransactionStatusUpdateResult(BaseModel):
+    updated: List[TransactionResponse]
+    missing: List[UUID]
+
 class TransactionUpdate(BaseModel):
     cashier_id: Optional[UUID] = None
     total_price: Optional[int] = None
-    status: Optional[str] = 'paid'
\ No newline at end of file
+    status: Optional[str] = 'paid'
+
+    @validator('status')
+    def validate_status(cls, v):
+        return v if v is None else validate_transaction_status(v)
\ No newline at end of file
@@ -1,15 +1,24 @@
-from fastapi import APIRouter, HTTPException, status
-from routers.models.models import AddNewProduct, ProductResponse, ProductUpdate
-from db.repository import repository
-from typing import List
+from fastapi import APIRouter, Header, HTTPException, Query, Request, status
+from pydantic import ValidationError
+from routers.models.models import (
+    AddNewProduct, ProductResponse, ProductUpdate, ProductBatchRequest, ProductBatchResponse
+)
+from db.dependencies import UnitOfWorkRoute, repository_dependency
+from db.pagination import encode_cursor
+from routers.import_parsers import parse_csv, parse_ndjson
+from routers.responses import FastJSONResponse, etag_matches, not_modified, product_response
+from typing import List, Optional
 from uuid import UUID
 
+MAX_BATCH_PRODUCTS = 5000
+
 product_router = APIRouter(
     prefix='/api/product',
+    route_class=UnitOfWorkRoute
 )
 
 @product_router.post('/add_product')
-async def add_product(product: AddNewProduct):
+async def add_product(product: AddNewProduct, repository: repository_dependency):
     try:
         product_data = {
             "name": product.name,
@@ -31,37 +40,188 @@ async def add_product(product: AddNewProduct):
             detail=f"Internal server error: {str(e)}"
         )
         
+@product_router.post('/import')
+async def import_products(
+    request: Request,
+    repository: repository_dependency,
+    batch_size: int = Query(5000, ge=1, le=50000)
+):
+    content_type = request.headers.get('content-type', '')
+    if 'csv' in content_type:
+        rows = parse_csv(request.stream())
+    elif 'json' in content_type:
+        rows = parse_ndjson(request.stream())
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Expected text/csv or application/x-ndjson body"
+        )
+
+    errors = []
+    received = 0
+
+    async def batches():
+        nonlocal received
+        batch = []
+        async for line_no, row, error in rows:
+            received += 1
+            if error is None:
+                row.setdefault('quantity', 0)
+                try:
+                    product = AddNewProduct(**row)
+                    if len(product.name) > 100:
+                        error = "name: must be at most 100 characters"
+                except ValidationError as e:
+                    error = '; '.join(
+                        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+                        for err in e.errors()
+                    )
+            if error is not None:
+                errors.append({'row': line_no, 'detail': error})
+                continue
+
+            batch.append({
+                'name': product.name,
+                'price': product.price,
+                'quantity': product.quantity
+            })
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    try:
+        imported = await repository.import_products(batches())
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to import products: {str(e)}"
+        )
+
+    return {
+        'received': received,
+        'imported': imported,
+        'failed': len(errors),
+        'errors': errors
+    }
+        
 @product_router.get("/", response_model=List[ProductResponse])
-async def list_products(skip: int = 0, limit: int = 100):
+async def list_products(
+    repository: repository_dependency,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
+):
+    try:
+        # read before the page, so a concurrent change can only make the tag stale, never the body
+        etag = f'"{await repository.get_catalog_version()}"'
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        products = await repository.get_products(skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch products: {str(e)}"
+        )
+
+    response = FastJSONResponse(
+        [product_response(product) for product in products],
+        headers={'ETag': etag, 'Cache-Control': 'no-cache'}
+    )
+    if products and len(products) == limit:
+        last = products[-1]
+        response.headers['X-Next-Cursor'] = encode_cursor(last['price'], last['id'])
+    return response
+
+@product_router.get("/search", response_model=List[ProductResponse])
+async def search_products(
+    repository: repository_dependency,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=50),
+    prefix: bool = False
+):
     try:
-        products = await repository.get_products(skip=skip, limit=limit)
-        return products
+        products = await repository.search_products(q, limit=limit, prefix=prefix)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to search products: {str(e)}"
+        )
+    return FastJSONResponse([product_response(product) for product in products])
+
+async def _get_products_batch(product_ids: List[UUID], repository) -> FastJSONResponse:
+    if not product_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No product ids provided"
+        )
+    if len(product_ids) > MAX_BATCH_PRODUCTS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_BATCH_PRODUCTS} products per batch"
+        )
+    try:
+        products = await repository.get_products_by_ids(product_ids)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch products: {str(e)}"
         )
 
-@product_router.get("/{product_id}")
-async def get_product(product_id: UUID):
+    found = {product['id'] for product in products}
+    return FastJSONResponse({
+        'products': [product_response(product) for product in products],
+        'missing': [product_id for product_id in dict.fromkeys(product_ids) if product_id not in found]
+    })
+
+@product_router.get("/batch", response_model=ProductBatchResponse)
+async def get_products_batch(repository: repository_dependency, ids: List[UUID] = Query([])):
+    return await _get_products_batch(ids, repository)
+
+@product_router.post("/batch", response_model=ProductBatchResponse)
+async def post_products_batch(batch: ProductBatchRequest, repository: repository_dependency):
+    return await _get_products_batch(batch.ids, repository)
+
+@product_router.get("/{product_id}", response_model=ProductResponse)
+async def get_product(
+    product_id: UUID,
+    repository: repository_dependency,
+    if_none_match: Optional[str] = Header(None)
+):
     try:
         product = await repository.get_product(product_id)
-        if not product:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Product not found"
-            )
-        return product
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch product: {str(e)}"
         )
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    etag = f'"{product["version"]}"'
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return FastJSONResponse(product_response(product), headers={'ETag': etag, 'Cache-Control': 'no-cache'})
         
 @product_router.put('/update_product/{product_id}', response_model=ProductResponse)
 async def update_product(
     product_id: UUID,
     product_update: ProductUpdate,
+    repository: repository_dependency,
 ):
     try:
         update_data = {
@@ -102,6 +262,7 @@ async def update_product(
 async def patch_product(
     product_id: UUID,
     product_update: ProductUpdate,
+    repository: repository_dependency,
 ):
     try:
         update_data = {
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, status
+from datetime import datetime
+from typing import List, Literal, Optional
+from routers.models.models import SalesReportRow
+from db.dependencies import UnitOfWorkRoute, repository_dependency
+from auth.core_functions import user_dependency
+
+
+reports_router = APIRouter(prefix="/reports", route_class=UnitOfWorkRoute)
+
+@reports_router.get("/sales", response_model=List[SalesReportRow])
+async def get_sales_report(
+    user: user_dependency,
+    repository: repository_dependency,
+    group_by: Literal['day', 'week', 'product', 'cashier'] = 'day',
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    transaction_status: Literal['paid', 'canceled'] = 'paid'
+):
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    try:
+        return await repository.get_sales_report(
+            group_by=group_by,
+            start_date=start_date,
+            end_date=end_date,
+            status=transaction_status
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to build sales report: {str(e)}"
+        )
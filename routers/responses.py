@@ -0,0 +1,58 @@
+from fastapi.responses import Response
+from typing import Any, Optional
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(',', ':')).encode()
+
+
+class FastJSONResponse(Response):
+    media_type = 'application/json'
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # weak comparison, as If-None-Match requires
+    return any(
+        tag.strip().removeprefix('W/') == etag
+        for tag in if_none_match.split(',')
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+
+
+def product_response(product: dict) -> dict:
+    return {
+        'id': product['id'],
+        'name': product['name'],
+        'price': int(product['price']),
+        'quantity': int(product['quantity']),
+        'created_at': product['created_at']
+    }
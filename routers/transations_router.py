@@ -1,27 +1,61 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 from uuid import UUID
-from typing import List, Optional
-from routers.models.models import TransactionResponse, TransactionUpdate, TransactionRequest
-from db.repository import repository
+from typing import Annotated, List, Literal, Optional
+from routers.models.models import (
+    TransactionResponse, TransactionUpdate, TransactionRequest,
+    OfflineTransactionRequest, TransactionBatchResult,
+    TransactionStatusUpdate, TransactionStatusUpdateResult
+)
+from db.repository import repository as shared_repository
+from db.dependencies import UnitOfWorkRoute, repository_dependency
+from db.idempotency import IdempotencyKeyMismatch
+from db.pagination import encode_cursor
+from routers.responses import FastJSONResponse, dumps
 from auth.core_functions import user_dependency
 import uuid
+import csv
+import hashlib
+import io
 
 
-transaction_router = APIRouter(prefix="/transactions")
+transaction_router = APIRouter(prefix="/transactions", route_class=UnitOfWorkRoute)
+
+MAX_BATCH_TRANSACTIONS = 1000
 
 @transaction_router.post("/", response_model=TransactionResponse)
-async def create_transaction(transaction_data: TransactionRequest):
+async def create_transaction(
+    transaction_data: TransactionRequest,
+    repository: repository_dependency,
+    response: Response,
+    idempotency_key: Annotated[Optional[str], Header(min_length=1, max_length=255)] = None
+):
     try:
         transaction_dict = transaction_data.dict()
-        
+        if idempotency_key is not None:
+            request_hash = hashlib.sha256(dumps(transaction_dict)).hexdigest()
+
         transaction_dict['id'] = uuid.uuid4()
         transaction_dict['created_at'] = datetime.utcnow()
         transaction_dict['updated_at'] = datetime.utcnow()
-        
+
+        if idempotency_key is not None:
+            created_transaction, replayed = await repository.create_transaction_idempotent(
+                transaction_dict, idempotency_key, request_hash
+            )
+            if replayed:
+                response.headers['Idempotent-Replayed'] = 'true'
+            return created_transaction
+
         created_transaction = await repository.create_transaction_with_items(transaction_dict)
         return created_transaction
         
+    except IdempotencyKeyMismatch as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -33,55 +67,204 @@ async def create_transaction(transaction_data: TransactionRequest):
             detail=f"Failed to create transaction: {str(e)}"
         )
 
+@transaction_router.post("/batch", response_model=List[TransactionBatchResult])
+async def create_transactions_batch(
+    transactions: List[OfflineTransactionRequest],
+    repository: repository_dependency
+):
+    if not transactions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No transactions provided"
+        )
+    if len(transactions) > MAX_BATCH_TRANSACTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_BATCH_TRANSACTIONS} transactions per batch"
+        )
+    try:
+        now = datetime.utcnow()
+        transaction_dicts = []
+        for transaction_data in transactions:
+            transaction_dict = transaction_data.dict()
+            transaction_dict['id'] = uuid.uuid4()
+            transaction_dict['created_at'] = transaction_dict['created_at'] or now
+            transaction_dict['updated_at'] = now
+            transaction_dicts.append(transaction_dict)
+
+        return await repository.create_transactions_batch(transaction_dicts)
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create transactions: {str(e)}"
+        )
+
 @transaction_router.get("/", response_model=List[TransactionResponse])
 async def get_transactions(
     user: user_dependency,
+    repository: repository_dependency,
     skip: int = 0,
     limit: int = 100,
     start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None,
+    cursor: Optional[str] = None
 ):
     if user['role'] != 'admin':
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
     try:
-        if user['role'] != 'admin':
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
         transactions = await repository.get_transactions_with_items(
             skip=skip,
             limit=limit,
             start_date=start_date,
-            end_date=end_date
+            end_date=end_date,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
-        return transactions
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get transactions: {str(e)}"
         )
 
+    response = FastJSONResponse(transactions)
+    if transactions and len(transactions) == limit:
+        last = transactions[-1]
+        response.headers['X-Next-Cursor'] = encode_cursor(last['created_at'], last['id'])
+    return response
+
+EXPORT_CSV_COLUMNS = [
+    'transaction_id', 'cashier_id', 'total_price', 'status', 'created_at',
+    'updated_at', 'product_id', 'name', 'price', 'quantity'
+]
+EXPORT_CHUNK_SIZE = 500
+
+async def _export_ndjson(transactions):
+    lines = []
+    async for transaction in transactions:
+        lines.append(dumps(transaction))
+        if len(lines) >= EXPORT_CHUNK_SIZE:
+            yield b'\n'.join(lines) + b'\n'
+            lines = []
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
+
+async def _export_csv(transactions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_CSV_COLUMNS)
+    rows = 0
+    async for transaction in transactions:
+        head = [
+            transaction['id'], transaction['cashier_id'], transaction['total_price'],
+            transaction['status'], transaction['created_at'], transaction['updated_at']
+        ]
+        for item in transaction['items'] or [{}]:
+            writer.writerow(head + [
+                item.get('product_id'), item.get('name'), item.get('price'), item.get('quantity')
+            ])
+            rows += 1
+        if rows >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            rows = 0
+    yield buffer.getvalue()
+
+@transaction_router.get("/export")
+async def export_transactions(
+    user: user_dependency,
+    format: Literal['ndjson', 'csv'] = 'ndjson',
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+):
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    # streamed after the handler returns, so it runs in its own session
+    # rather than the request's unit of work
+    transactions = shared_repository.stream_transactions_with_items(
+        start_date=start_date,
+        end_date=end_date
+    )
+    if format == 'csv':
+        return StreamingResponse(
+            _export_csv(transactions),
+            media_type='text/csv',
+            headers={'Content-Disposition': 'attachment; filename="transactions.csv"'}
+        )
+    return StreamingResponse(
+        _export_ndjson(transactions),
+        media_type='application/x-ndjson'
+    )
+
 @transaction_router.get("/{transaction_id}", response_model=TransactionResponse)
-async def get_transaction(user: user_dependency, transaction_id: UUID):
+async def get_transaction(user: user_dependency, transaction_id: UUID, repository: repository_dependency):
     if user['role'] != 'admin':
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
     try:
         transaction = await repository.get_transaction_with_items(transaction_id)
-        if not transaction:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Transaction not found"
-            )
-        return transaction
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get transaction: {str(e)}"
         )
+    if not transaction:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transaction not found"
+        )
+    return FastJSONResponse(transaction)
+
+@transaction_router.patch("/status", response_model=TransactionStatusUpdateResult)
+async def update_transactions_status(
+    user: user_dependency,
+    status_update: TransactionStatusUpdate,
+    repository: repository_dependency
+):
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    if not status_update.transaction_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No transactions provided"
+        )
+    if len(status_update.transaction_ids) > MAX_BATCH_TRANSACTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_BATCH_TRANSACTIONS} transactions per batch"
+        )
+    try:
+        return await repository.update_transactions_status(
+            transaction_ids=status_update.transaction_ids,
+            status=status_update.status
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update transactions: {str(e)}"
+        )
 
 @transaction_router.patch("/{transaction_id}", response_model=TransactionResponse)
 async def patch_transaction(
     user: user_dependency,
     transaction_id: UUID,
-    transaction_update: TransactionUpdate
+    transaction_update: TransactionUpdate,
+    repository: repository_dependency
 ):
     if user['role'] != 'admin':
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
@@ -110,6 +293,8 @@ async def patch_transaction(
             
         return updated_transaction
         
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -122,7 +307,7 @@ async def patch_transaction(
         )
 
 @transaction_router.delete("/{transaction_id}")
-async def delete_transaction(user: user_dependency, transaction_id: UUID):
+async def delete_transaction(user: user_dependency, transaction_id: UUID, repository: repository_dependency):
     if user['role'] != 'admin':
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
     try:
@@ -0,0 +1,292 @@
+"""Drive every router endpoint concurrently and report latency percentiles.
+
+Starts api.api:app in-process with uvicorn against the database configured in
+.env, which should be a local, disposable Postgres: the run seeds users,
+products and transactions into it. Results are written as JSON so that two
+runs can be diffed.
+
+Usage: python -m scripts.bench_endpoints [--requests 500] [--concurrency 20] [--output bench_output.json]
+"""
+from datetime import datetime
+from db.auth_repository import auth_repository
+from db.repository import repository
+from auth.password_hasher import password_hasher
+import argparse
+import asyncio
+import httpx
+import json
+import math
+import platform
+import random
+import socket
+import subprocess
+import time
+import uuid
+import uvicorn
+
+BENCH_PASSWORD = 'bench-password'
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    # nearest rank; rounded first so 0.95 * 500 is 475, not 475.00000000000006
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(round(fraction * len(sorted_values), 9))
+    return sorted_values[min(len(sorted_values) - 1, max(0, rank - 1))]
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True).strip()
+    except Exception:
+        return 'unknown'
+
+
+async def seed(products: int, transactions: int, deletable: int, rng: random.Random) -> dict:
+    suffix = uuid.uuid4().hex[:8]
+    admin = f'bench-admin-{suffix}'
+    cashier = f'bench-cashier-{suffix}'
+    password_hash = await password_hasher.hash(BENCH_PASSWORD)
+    await auth_repository.register_user({'username': admin, 'password': password_hash, 'role': 'admin'})
+    await auth_repository.register_user({'username': cashier, 'password': password_hash, 'role': 'cashier'})
+    cashier_id = uuid.UUID((await auth_repository.get_user(cashier))['id'])
+
+    async def product_batches():
+        yield [{
+            'name': f'Bench product {suffix} {index}',
+            'price': rng.randint(1, 1000),
+            'quantity': 1_000_000
+        } for index in range(products)]
+
+    await repository.import_products(product_batches())
+    if repository.catalog is not None:
+        await repository.catalog.load()
+    product_ids = [product['id'] for product in await repository.get_products(limit=products)]
+
+    transaction_ids = []
+    for start in range(0, transactions + deletable, 1000):
+        batch = [{
+            'cashier_id': cashier_id,
+            'status': 'paid',
+            'items': [
+                {'product_id': product_id, 'quantity': rng.randint(1, 3)}
+                for product_id in rng.sample(product_ids, 3)
+            ],
+            'created_at': datetime.utcnow()
+        } for _ in range(start, min(start + 1000, transactions + deletable))]
+        results = await repository.create_transactions_batch(batch)
+        transaction_ids.extend(
+            result['transaction']['id'] for result in results if result['status'] == 'created'
+        )
+
+    return {
+        'admin': admin,
+        'cashier_id': str(cashier_id),
+        'product_ids': [str(product_id) for product_id in product_ids],
+        'transaction_ids': [str(transaction_id) for transaction_id in transaction_ids[:transactions]],
+        # DELETE /transactions/{id} takes each of these once
+        'deletable_ids': [str(transaction_id) for transaction_id in transaction_ids[transactions:]]
+    }
+
+
+def build_scenarios(data: dict, rng: random.Random) -> dict:
+    """Every endpoint except logout, which would sign the client out mid-run."""
+    def random_product():
+        return rng.choice(data['product_ids'])
+
+    def random_transaction():
+        return rng.choice(data['transaction_ids'])
+
+    def product_body():
+        return {'json': {
+            'name': f'Bench product {uuid.uuid4().hex[:8]}',
+            'price': rng.randint(1, 1000),
+            'quantity': 1_000_000
+        }}
+
+    def import_body():
+        lines = [json.dumps({
+            'name': f'Bench import {uuid.uuid4().hex[:8]}',
+            'price': rng.randint(1, 1000),
+            'quantity': 1000
+        }) for _ in range(10)]
+        return {
+            'content': '\n'.join(lines).encode(),
+            'headers': {'content-type': 'application/x-ndjson'}
+        }
+
+    def sale():
+        return {
+            'cashier_id': data['cashier_id'],
+            'items': [{'product_id': random_product(), 'quantity': 1}]
+        }
+
+    deletable = iter(data['deletable_ids'])
+    replay_keys = [f'bench-{uuid.uuid4().hex}' for _ in range(20)]
+    return {
+        'POST /api/auth/login': lambda: ('POST', '/api/auth/login', {
+            'json': {'username': data['admin'], 'password': BENCH_PASSWORD}
+        }),
+        'POST /api/auth/register': lambda: ('POST', '/api/auth/register', {'json': {
+            'username': f'bench-user-{uuid.uuid4().hex[:12]}',
+            'password': BENCH_PASSWORD,
+            'role': 'cashier'
+        }}),
+        'GET /api/auth/me': lambda: ('GET', '/api/auth/me', None),
+        'POST /api/product/add_product': lambda: ('POST', '/api/product/add_product', product_body()),
+        'POST /api/product/import': lambda: ('POST', '/api/product/import', import_body()),
+        'GET /api/product': lambda: ('GET', '/api/product/', None),
+        'GET /api/product/search': lambda: ('GET', '/api/product/search', {
+            'params': {'q': f'product {rng.randint(0, 99)}'}
+        }),
+        'GET /api/product/search (prefix)': lambda: ('GET', '/api/product/search', {
+            'params': {'q': 'bench product', 'prefix': 'true'}
+        }),
+        'GET /api/product/batch': lambda: ('GET', '/api/product/batch', {
+            'params': [('ids', product_id) for product_id in rng.sample(data['product_ids'], 20)]
+        }),
+        'POST /api/product/batch': lambda: ('POST', '/api/product/batch', {
+            'json': {'ids': rng.sample(data['product_ids'], 200)}
+        }),
+        'GET /api/product/{id}': lambda: ('GET', f'/api/product/{random_product()}', None),
+        'PUT /api/product/update_product/{id}': lambda: (
+            'PUT', f'/api/product/update_product/{random_product()}', product_body()
+        ),
+        'PATCH /api/product/patch_product/{id}': lambda: (
+            'PATCH', f'/api/product/patch_product/{random_product()}', product_body()
+        ),
+        'POST /transactions': lambda: ('POST', '/transactions/', {'json': sale()}),
+        'POST /transactions (idempotent replay)': lambda: ('POST', '/transactions/', {
+            'json': {
+                'cashier_id': data['cashier_id'],
+                'items': [{'product_id': data['product_ids'][0], 'quantity': 1}]
+            },
+            'headers': {'idempotency-key': rng.choice(replay_keys)}
+        }),
+        'POST /transactions/batch': lambda: ('POST', '/transactions/batch', {
+            'json': [sale() for _ in range(50)]
+        }),
+        'GET /transactions': lambda: ('GET', '/transactions/', None),
+        'GET /transactions/export': lambda: ('GET', '/transactions/export', {
+            'params': {'start_date': datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0).isoformat()}
+        }),
+        'GET /transactions/{id}': lambda: ('GET', f'/transactions/{random_transaction()}', None),
+        'PATCH /transactions/status': lambda: ('PATCH', '/transactions/status', {'json': {
+            'transaction_ids': rng.sample(data['transaction_ids'], 10),
+            'status': rng.choice(['paid', 'canceled'])
+        }}),
+        'PATCH /transactions/{id}': lambda: ('PATCH', f'/transactions/{random_transaction()}', {
+            'json': {'status': rng.choice(['paid', 'canceled'])}
+        }),
+        'DELETE /transactions/{id}': lambda: ('DELETE', f'/transactions/{next(deletable)}', None),
+        'GET /reports/sales': lambda: ('GET', '/reports/sales', None),
+        'GET /internal/db/pool': lambda: ('GET', '/internal/db/pool', None),
+        'GET /internal/cache': lambda: ('GET', '/internal/cache', None),
+        'GET /internal/catalog': lambda: ('GET', '/internal/catalog', None),
+        'GET /internal/db/replicas': lambda: ('GET', '/internal/db/replicas', None),
+        'GET /internal/idempotency': lambda: ('GET', '/internal/idempotency', None),
+        'GET /internal/password_hasher': lambda: ('GET', '/internal/password_hasher', None),
+        'GET /metrics': lambda: ('GET', '/metrics', None),
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, make_request, requests: int, concurrency: int) -> dict:
+    latencies = []
+    statuses = {}
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            method, path, options = make_request()
+            started_at = time.perf_counter()
+            response = await client.request(method, path, **(options or {}))
+            latencies.append((time.perf_counter() - started_at) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'throughput_rps': round(requests / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'max_ms': round(latencies[-1], 3) if latencies else 0.0,
+        'statuses': {str(code): count for code, count in sorted(statuses.items())}
+    }
+
+
+async def main(args) -> None:
+    rng = random.Random(args.seed)
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config('api.api:app', host='127.0.0.1', port=port, log_level='warning'))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    try:
+        data = await seed(args.products, args.transactions, args.requests + args.warmup, rng)
+        scenarios = build_scenarios(data, rng)
+        if args.only:
+            scenarios = {name: scenario for name, scenario in scenarios.items() if name in args.only}
+
+        async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', timeout=30) as client:
+            async def login():
+                response = await client.post(
+                    '/api/auth/login', json={'username': data['admin'], 'password': BENCH_PASSWORD}
+                )
+                response.raise_for_status()
+
+            for name, make_request in scenarios.items():
+                await login()
+                await run_scenario(client, make_request, min(args.warmup, args.requests), args.concurrency)
+
+            results = {}
+            for name, make_request in scenarios.items():
+                await login()
+                results[name] = await run_scenario(client, make_request, args.requests, args.concurrency)
+                print(f"{name:40} p50 {results[name]['p50_ms']:8.2f} ms  p95 {results[name]['p95_ms']:8.2f} ms  "
+                      f"p99 {results[name]['p99_ms']:8.2f} ms  {results[name]['throughput_rps']:9.1f} req/s")
+    finally:
+        server.should_exit = True
+        await server_task
+
+    report = {
+        'revision': git_revision(),
+        'started_at': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'settings': {
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'products': args.products,
+            'transactions': args.transactions,
+            'seed': args.seed
+        },
+        'endpoints': results
+    }
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2, sort_keys=True, default=str)
+    print(f'Results written to {args.output}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--transactions', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='*', default=None)
+    parser.add_argument('--output', default='bench_output.json')
+    asyncio.run(main(parser.parse_args()))
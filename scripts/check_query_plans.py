@@ -0,0 +1,172 @@
+"""Fail when a hot-path repository query plans a sequential scan.
+
+Seeds the configured database inside a transaction that is rolled back at
+the end, runs the repository read methods against it, and EXPLAINs every
+SELECT they issue.
+
+Usage: python -m scripts.check_query_plans
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from db.db_connection import engine
+from db.pagination import encode_cursor
+from db.repository import Repository
+import asyncio
+import json
+import random
+import sys
+import uuid
+
+HOT_TABLES = {'products', 'transactions', 'transaction_product'}
+
+SEED_PRODUCTS = 20000
+SEED_TRANSACTIONS = 50000
+SEED_ITEMS_PER_TRANSACTION = 3
+
+
+async def seed(driver_connection, rng: random.Random) -> dict:
+    now = datetime.utcnow()
+    cashier_id = uuid.uuid4()
+    await driver_connection.copy_records_to_table(
+        'users',
+        records=[(cashier_id, f'plan-check-{cashier_id.hex[:8]}', '-', 'cashier', now)],
+        columns=['id', 'username', 'password_hash', 'role', 'created_at']
+    )
+
+    products = [(
+        uuid.uuid4(),
+        f'Product {index}',
+        Decimal(rng.randint(100, 100000)) / 100,
+        Decimal(rng.randint(0, 1000)),
+        now
+    ) for index in range(SEED_PRODUCTS)]
+    await driver_connection.copy_records_to_table(
+        'products',
+        records=products,
+        columns=['id', 'name', 'price', 'quantity', 'created_at']
+    )
+
+    transactions = []
+    items = []
+    for _ in range(SEED_TRANSACTIONS):
+        transaction_id = uuid.uuid4()
+        created_at = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+        basket = rng.sample(products, SEED_ITEMS_PER_TRANSACTION)
+        transactions.append((
+            transaction_id,
+            cashier_id,
+            sum(product[2] for product in basket),
+            'paid',
+            created_at,
+            created_at
+        ))
+        items.extend((transaction_id, product[0], Decimal(1)) for product in basket)
+
+    await driver_connection.copy_records_to_table(
+        'transactions',
+        records=transactions,
+        columns=['id', 'cashier_id', 'total_price', 'status', 'created_at', 'updated_at']
+    )
+    await driver_connection.copy_records_to_table(
+        'transaction_product',
+        records=items,
+        columns=['transaction_id', 'product_id', 'quantity']
+    )
+    for table in sorted(HOT_TABLES):
+        await driver_connection.execute(f'ANALYZE {table}')
+
+    transactions.sort(key=lambda transaction: (transaction[4], transaction[0]), reverse=True)
+    products.sort(key=lambda product: (product[2], product[0]), reverse=True)
+    middle_transaction = transactions[len(transactions) // 2]
+    middle_product = products[len(products) // 2]
+    return {
+        'now': now,
+        'product': middle_product,
+        'transaction': middle_transaction
+    }
+
+
+def walk_plan(node: dict):
+    yield node
+    for child in node.get('Plans', []):
+        yield from walk_plan(child)
+
+
+async def main() -> int:
+    rng = random.Random(0)
+    captured = []
+    current = {'check': None}
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if current['check'] and statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            captured.append((current['check'], statement, parameters))
+
+    async with engine.connect() as connection:
+        outer_transaction = await connection.begin()
+        try:
+            # the driver only opens its transaction on the first statement,
+            # so start it before COPYing seed data through the raw connection
+            await connection.execute(text('SELECT 1'))
+            raw_connection = await connection.get_raw_connection()
+            driver_connection = raw_connection.driver_connection
+            samples = await seed(driver_connection, rng)
+
+            repository = Repository(async_sessionmaker(
+                bind=connection,
+                expire_on_commit=False,
+                join_transaction_mode='create_savepoint'
+            ))
+            product = samples['product']
+            transaction = samples['transaction']
+            checks = [
+                ('get_products', lambda: repository.get_products(limit=100)),
+                ('get_products (cursor)', lambda: repository.get_products(
+                    limit=100, cursor=encode_cursor(product[2], product[0])
+                )),
+                ('get_product', lambda: repository.get_product(product[0])),
+                ('search_products', lambda: repository.search_products('uct 1234')),
+                ('search_products (prefix)', lambda: repository.search_products('product 12', prefix=True)),
+                ('get_transactions_with_items', lambda: repository.get_transactions_with_items(limit=100)),
+                ('get_transactions_with_items (cursor)', lambda: repository.get_transactions_with_items(
+                    limit=100, cursor=encode_cursor(transaction[4].isoformat(), transaction[0])
+                )),
+                ('get_transactions_with_items (date range)', lambda: repository.get_transactions_with_items(
+                    limit=100,
+                    start_date=samples['now'] - timedelta(days=1),
+                    end_date=samples['now']
+                )),
+                ('get_transaction_with_items', lambda: repository.get_transaction_with_items(transaction[0])),
+                ('get_transaction_items', lambda: repository.get_transaction_items(transaction[0])),
+            ]
+
+            event.listen(engine.sync_engine, 'before_cursor_execute', capture)
+            try:
+                for name, check in checks:
+                    current['check'] = name
+                    await check()
+            finally:
+                current['check'] = None
+                event.remove(engine.sync_engine, 'before_cursor_execute', capture)
+
+            failures = []
+            for name, statement, parameters in captured:
+                plan = await driver_connection.fetchval(
+                    f'EXPLAIN (FORMAT JSON) {statement}', *(parameters or ())
+                )
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                for node in walk_plan(plan[0]['Plan']):
+                    if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in HOT_TABLES:
+                        failures.append((name, node['Relation Name'], statement))
+        finally:
+            await outer_transaction.rollback()
+
+    for name, table, statement in failures:
+        print(f'FAIL {name}: sequential scan on {table}\n    {" ".join(statement.split())}')
+    print(f'{len(captured)} queries checked, {len(failures)} sequential scans on hot tables')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,17 @@
+"""Delete idempotency keys older than IDEMPOTENCY_KEY_TTL.
+
+Usage: python -m scripts.purge_idempotency_keys
+"""
+from db.repository import idempotency_purger
+import argparse
+import asyncio
+
+
+async def main() -> None:
+    deleted = await idempotency_purger.purge()
+    print(f'idempotency_keys purged: {deleted} rows')
+
+
+if __name__ == '__main__':
+    argparse.ArgumentParser(description=__doc__.splitlines()[0]).parse_args()
+    asyncio.run(main())
@@ -0,0 +1,21 @@
+"""Rebuild daily_product_sales and daily_sales from transactions and their line items.
+
+Usage: python -m scripts.rebuild_sales_rollup [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+"""
+from datetime import date
+from db.repository import repository
+import argparse
+import asyncio
+
+
+async def main(start_date: date = None, end_date: date = None) -> None:
+    rows = await repository.rebuild_sales_rollup(start_date=start_date, end_date=end_date)
+    print(f'daily_product_sales rebuilt: {rows} rows')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--start', type=date.fromisoformat, default=None)
+    parser.add_argument('--end', type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.start, args.end))
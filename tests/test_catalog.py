@@ -0,0 +1,114 @@
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+from db.catalog import CatalogSnapshot, product_delta
+from types import SimpleNamespace
+
+
+def make_product(version: int, price: str = '10.00', quantity: str = '5'):
+    return SimpleNamespace(
+        id=uuid4(),
+        name=f'Product {version}',
+        price=Decimal(price),
+        quantity=Decimal(quantity),
+        created_at=datetime(2026, 1, 1),
+        version=version
+    )
+
+
+def make_catalog(products) -> CatalogSnapshot:
+    catalog = CatalogSnapshot(db=None, dsn='postgresql://unused')
+    for product in products:
+        catalog.apply(product_delta(product))
+    return catalog
+
+
+def test_version_changes_when_older_write_commits_last():
+    products = [make_product(version) for version in range(1, 6)]
+    catalog = make_catalog(products)
+    before = catalog.version()
+
+    # T1 takes version 100 for product A, T2 takes 101 for product B, T2 commits first
+    product_b = products[1]
+    product_b.version, product_b.quantity = 101, Decimal('4')
+    catalog.apply(product_delta(product_b))
+    after_t2 = catalog.version()
+
+    product_a = products[0]
+    product_a.version, product_a.price = 100, Decimal('12.00')
+    catalog.apply(product_delta(product_a))
+    after_t1 = catalog.version()
+
+    assert len({before, after_t2, after_t1}) == 3
+    assert catalog.get(product_a.id)['price'] == 12.0
+
+
+def test_version_changes_on_delete_and_insert():
+    products = [make_product(version) for version in range(1, 4)]
+    catalog = make_catalog(products)
+    before = catalog.version()
+
+    catalog.apply({'op': 'delete', 'id': str(products[0].id), 'version': 4})
+    after_delete = catalog.version()
+    catalog.apply(product_delta(make_product(5)))
+
+    assert len({before, after_delete, catalog.version()}) == 3
+
+
+def test_stale_delta_leaves_version_unchanged():
+    product = make_product(7)
+    catalog = make_catalog([product])
+    before = catalog.version()
+
+    stale = make_product(3)
+    stale.id = product.id
+    catalog.apply(product_delta(stale))
+
+    assert catalog.version() == before
+
+
+def database_reading(products) -> dict:
+    return {'products': len(products), 'version_sum': sum(product.version for product in products)}
+
+
+def test_in_flight_deltas_do_not_count_as_divergence():
+    products = [make_product(version) for version in range(1, 6)]
+    catalog = make_catalog(products)
+
+    # two checkouts have committed but their deltas are still in another worker's outbox
+    products[0].version, products[0].quantity = 6, Decimal('4')
+    products[3].version, products[3].quantity = 7, Decimal('4')
+    reading = database_reading(products)
+    removed_before = catalog.removed_version_sum
+    assert not catalog.matches(reading)
+
+    # the outbox is flushed, and more sales land after the reading was taken
+    catalog.apply(product_delta(products[0]))
+    catalog.apply(product_delta(products[3]))
+    products[2].version = 8
+    catalog.apply(product_delta(products[2]))
+
+    assert catalog.caught_up(reading, removed_before)
+
+
+def test_delete_after_reading_does_not_count_as_divergence():
+    products = [make_product(version) for version in range(1, 6)]
+    catalog = make_catalog(products)
+    reading = database_reading(products)
+    removed_before = catalog.removed_version_sum
+
+    catalog.apply({'op': 'delete', 'id': str(products[4].id), 'version': 6})
+
+    assert catalog.caught_up(reading, removed_before)
+
+
+def test_missed_delta_counts_as_divergence():
+    products = [make_product(version) for version in range(1, 6)]
+    catalog = make_catalog(products)
+
+    products[1].version, products[1].price = 6, Decimal('11.00')
+    reading = database_reading(products)
+    removed_before = catalog.removed_version_sum
+
+    # the delta for products[1] never arrives
+    assert not catalog.caught_up(reading, removed_before)